@@ -0,0 +1,292 @@
+"""向量化财务比率与增长率计算
+
+输入为 parse_statement_frame / records_to_frame 得到的资产负债表、利润表 DataFrame
+(列为接口字段名)，按 (股票代码, 报告期) 对齐后整列计算:
+- 偿债能力: 资产负债率、流动比率、速动比率、现金比率、权益乘数
+- 盈利能力: 毛利率、营业利润率、净利率、期间费用率、ROE、ROA
+- 增长: 环比(QoQ)、同比(YoY)
+- TTM: 最近连续4个季度的单季利润表数据之和(利润表接口为单季数据)
+
+除数为 0 或缺失时结果为 NaN，不会抛出 ZeroDivisionError
+"""
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.collectors.report_calendar import report_calendar
+
+KEY_COLUMNS = ['SECUCODE', 'REPORT_DATE']
+
+# 参与计算的接口字段
+BALANCE_FIELDS = [
+    'TOTAL_ASSETS', 'TOTAL_LIABILITIES', 'TOTAL_EQUITY', 'TOTAL_PARENT_EQUITY',
+    'TOTAL_CURRENT_ASSETS', 'TOTAL_CURRENT_LIAB', 'INVENTORY', 'MONETARYFUNDS',
+]
+PROFIT_FIELDS = [
+    'TOTAL_OPERATE_INCOME', 'OPERATE_INCOME', 'OPERATE_COST', 'OPERATE_PROFIT',
+    'SALE_EXPENSE', 'MANAGE_EXPENSE', 'FINANCE_EXPENSE', 'RESEARCH_EXPENSE',
+    'NETPROFIT', 'PARENT_NETPROFIT', 'DEDUCT_PARENT_NETPROFIT',
+]
+
+# TTM 字段 -> 结果列名
+TTM_FIELDS = {
+    'TOTAL_OPERATE_INCOME': '营业总收入TTM',
+    'NETPROFIT': '净利润TTM',
+    'PARENT_NETPROFIT': '归母净利润TTM',
+}
+
+# 增长率字段 -> 结果列名前缀
+GROWTH_FIELDS = {
+    'TOTAL_OPERATE_INCOME': '营业总收入',
+    'NETPROFIT': '净利润',
+    'PARENT_NETPROFIT': '归母净利润',
+    'TOTAL_ASSETS': '总资产',
+    'TOTAL_PARENT_EQUITY': '归母权益',
+}
+
+
+def safe_divide(numerator, denominator):
+    """逐元素除法，除数为 0 或 NaN 时结果为 NaN；标量输入返回 float"""
+    numerator = np.asarray(numerator, dtype='float64')
+    denominator = np.asarray(denominator, dtype='float64')
+    out = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=(denominator != 0) & ~np.isnan(denominator))
+    return float(out) if out.ndim == 0 else out
+
+
+def _growth(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    """增长率 = (本期 - 上期) / |上期|，上期为负时方向仍然正确"""
+    return safe_divide(current - previous, np.abs(previous))
+
+
+def _quarter_index(report_dates: pd.Series) -> np.ndarray:
+    """报告期在报告期日历中的序号，相邻季度序号相差 1"""
+    days = np.asarray(report_dates, dtype='datetime64[D]')
+    return np.searchsorted(report_calendar.report_dates, days)
+
+
+def _lag_positions(codes: np.ndarray, quarters: np.ndarray, k: int) -> np.ndarray:
+    """每行对应的同一股票 k 个季度之前那一行的位置，该季度不存在时为 -1
+
+    按 (股票序号 * 跨度 + 季度序号) 组合键二分查找目标季度本身，
+    与两者之间的季度是否缺失无关，也不要求数据已排序
+    """
+    positions = np.full(len(quarters), -1, dtype='int64')
+    if len(quarters) == 0:
+        return positions
+    _, code_ids = np.unique(codes, return_inverse=True)
+    # 跨度大于最大季度序号，股票之间的组合键不会重叠
+    span = int(quarters.max()) + 1
+    keys = code_ids.astype('int64') * span + quarters
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+
+    targets = keys - k
+    found = np.minimum(np.searchsorted(sorted_keys, targets), len(keys) - 1)
+    matched = (quarters >= k) & (sorted_keys[found] == targets)
+    positions[matched] = order[found[matched]]
+    return positions
+
+
+def _lag(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """按 _lag_positions 取出 k 个季度之前的数值，目标季度缺失时为 NaN"""
+    return np.where(positions >= 0, values[np.maximum(positions, 0)], np.nan) if len(values) else values
+
+
+def build_panel(balance: Optional[pd.DataFrame] = None, profit: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """把资产负债表、利润表按 (股票代码, 报告期) 外连接为一张按股票、报告期排序的面板
+
+    缺失的报表字段为 NaN
+    """
+    frames = []
+    for frame, fields in ((balance, BALANCE_FIELDS), (profit, PROFIT_FIELDS)):
+        if frame is None:
+            frame = pd.DataFrame(columns=KEY_COLUMNS)
+        columns = KEY_COLUMNS + [field for field in fields if field in frame.columns]
+        frame = frame[columns].drop_duplicates(KEY_COLUMNS, keep='last').set_index(KEY_COLUMNS)
+        frames.append(frame.reindex(columns=fields).astype('float64'))
+
+    panel = frames[0].join(frames[1], how='outer')
+    return panel.sort_index()
+
+
+def compute_ratios(panel: pd.DataFrame) -> pd.DataFrame:
+    """对 build_panel 得到的面板整列计算全部比率
+
+    返回:
+        以 (SECUCODE, REPORT_DATE) 为索引的比率表，比率为小数(0.35 表示 35%)
+    """
+    codes = panel.index.get_level_values('SECUCODE').to_numpy()
+    quarters = _quarter_index(panel.index.get_level_values('REPORT_DATE'))
+    col = {field: panel[field].to_numpy() for field in BALANCE_FIELDS + PROFIT_FIELDS}
+    lags = {k: _lag_positions(codes, quarters, k) for k in (1, 2, 3, 4)}
+
+    ttm = {}
+    for field in TTM_FIELDS:
+        # 4 个连续季度都存在才计算，任一缺期则为 NaN
+        ttm[field] = col[field] + sum(_lag(col[field], lags[k]) for k in (1, 2, 3))
+
+    revenue = col['TOTAL_OPERATE_INCOME']
+    period_expense = (col['SALE_EXPENSE'] + col['MANAGE_EXPENSE']
+                      + col['FINANCE_EXPENSE'] + col['RESEARCH_EXPENSE'])
+    result = {
+        '资产负债率': safe_divide(col['TOTAL_LIABILITIES'], col['TOTAL_ASSETS']),
+        '流动比率': safe_divide(col['TOTAL_CURRENT_ASSETS'], col['TOTAL_CURRENT_LIAB']),
+        '速动比率': safe_divide(col['TOTAL_CURRENT_ASSETS'] - col['INVENTORY'], col['TOTAL_CURRENT_LIAB']),
+        '现金比率': safe_divide(col['MONETARYFUNDS'], col['TOTAL_CURRENT_LIAB']),
+        '权益乘数': safe_divide(col['TOTAL_ASSETS'], col['TOTAL_EQUITY']),
+        '毛利率': safe_divide(col['OPERATE_INCOME'] - col['OPERATE_COST'], col['OPERATE_INCOME']),
+        '营业利润率': safe_divide(col['OPERATE_PROFIT'], revenue),
+        '净利率': safe_divide(col['NETPROFIT'], revenue),
+        '期间费用率': safe_divide(period_expense, revenue),
+        'ROE': safe_divide(col['PARENT_NETPROFIT'], col['TOTAL_PARENT_EQUITY']),
+        'ROA': safe_divide(col['NETPROFIT'], col['TOTAL_ASSETS']),
+        'ROE(TTM)': safe_divide(ttm['PARENT_NETPROFIT'], col['TOTAL_PARENT_EQUITY']),
+        'ROA(TTM)': safe_divide(ttm['NETPROFIT'], col['TOTAL_ASSETS']),
+    }
+    for field, name in TTM_FIELDS.items():
+        result[name] = ttm[field]
+    for field, name in GROWTH_FIELDS.items():
+        result[f'{name}环比'] = _growth(col[field], _lag(col[field], lags[1]))
+        result[f'{name}同比'] = _growth(col[field], _lag(col[field], lags[4]))
+
+    return pd.DataFrame(result, index=panel.index)
+
+
+def _fingerprints(panel: pd.DataFrame) -> pd.Series:
+    """每行源数据的哈希，用于判断缓存是否失效"""
+    fingerprints = pd.util.hash_pandas_object(panel, index=False)
+    fingerprints.index = panel.index
+    return fingerprints
+
+
+def _empty_fingerprints() -> pd.Series:
+    index = pd.MultiIndex.from_arrays([[], []], names=KEY_COLUMNS)
+    return pd.Series(index=index, dtype='uint64')
+
+
+class RatioEngine:
+    """按 (股票代码, 报告期) 缓存比率计算结果
+
+    由于环比/同比/TTM 依赖前几个季度，失效以股票为单位:
+    - compute: 传入任意 DataFrame，对源数据逐行计算哈希，只有源数据发生变化(新增、删除或数值改变)的股票才重新计算
+    - compute_from_stores: 按内存仓库中每只股票的版本号判断，版本号未变的股票不读取、不构建面板也不计算哈希
+    两种方式的缓存互不通用，交替调用时会整体重算一次
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._fingerprints = _empty_fingerprints()
+        # compute_from_stores 上次计算时各股票的 (资产负债表版本号, 利润表版本号)
+        self._versions: Dict[str, Tuple[int, int]] = {}
+        self._ratios: Optional[pd.DataFrame] = None
+        self.stats = {'computed': 0, 'reused': 0}
+
+    def compute(self, balance: Optional[pd.DataFrame] = None,
+                profit: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """计算(或从缓存取出)全部 (股票代码, 报告期) 的比率
+
+        参数:
+            balance: 资产负债表 DataFrame(接口字段列 + SECUCODE/REPORT_DATE)
+            profit: 利润表 DataFrame
+
+        返回:
+            以 (SECUCODE, REPORT_DATE) 为索引的比率表
+        """
+        panel = build_panel(balance, profit)
+        fingerprints = _fingerprints(panel)
+        codes = panel.index.get_level_values('SECUCODE')
+
+        with self._lock:
+            cached = self._fingerprints.reindex(panel.index)
+            changed_rows = cached.isna().to_numpy() | (cached.to_numpy() != fingerprints.to_numpy())
+            # 某只股票缓存中存在而本次源数据已删除的报告期，同样视为变化
+            removed = self._fingerprints.index.difference(panel.index)
+            changed = set(codes[changed_rows]) | set(removed.get_level_values('SECUCODE'))
+            stale = codes.isin(changed)
+
+            fresh = compute_ratios(panel[stale])
+            if self._ratios is None or stale.all():
+                ratios = fresh
+            else:
+                reused = self._ratios.reindex(panel.index[~stale])
+                ratios = pd.concat([reused, fresh]).sort_index()
+
+            self.stats['computed'] += int(stale.sum())
+            self.stats['reused'] += int((~stale).sum())
+            self._fingerprints = fingerprints
+            self._versions = {}
+            self._ratios = ratios
+        return ratios
+
+    def compute_from_stores(self) -> pd.DataFrame:
+        """用采集模块内存仓库中的资产负债表、利润表计算比率
+
+        只读取版本号自上次计算后发生变化的股票，为它们构建面板并重新计算，其余股票直接复用缓存
+        """
+        from data.collectors.get_balance_sheet import balance_sheet_store
+        from data.collectors.get_profit_sheet import profit_sheet_store
+        from data.collectors.statement_record import records_to_frame
+        from data.collectors.statement_schema import BALANCE_SCHEMA, PROFIT_SCHEMA
+
+        # 先取版本号再读数据: 期间发生的写入会使版本号再次变化，下次调用时重新计算
+        balance_versions, profit_versions = balance_sheet_store.versions(), profit_sheet_store.versions()
+        versions = {code: (balance_versions.get(code, 0), profit_versions.get(code, 0))
+                    for code in balance_versions.keys() | profit_versions.keys()}
+        with self._lock:
+            reusable = self._ratios if self._versions else None
+            changed = sorted(code for code, version in versions.items() if self._versions.get(code) != version)
+            if reusable is not None and not changed:
+                self.stats['reused'] += len(reusable)
+                return reusable
+
+            frames = [
+                records_to_frame([(code, report_date, record) for code in changed
+                                  for report_date, record in store.periods_of(code).items()], schema)
+                for store, schema in ((balance_sheet_store, BALANCE_SCHEMA), (profit_sheet_store, PROFIT_SCHEMA))
+            ]
+            fresh = compute_ratios(build_panel(*frames))
+            if reusable is None:
+                ratios = fresh
+            else:
+                reused = reusable[~reusable.index.get_level_values('SECUCODE').isin(changed)]
+                ratios = pd.concat([reused, fresh]).sort_index()
+                self.stats['reused'] += len(reused)
+
+            self.stats['computed'] += len(fresh)
+            self._fingerprints = _empty_fingerprints()
+            self._versions = versions
+            self._ratios = ratios
+        return ratios
+
+    def get(self, stock_code: str, report_date: str) -> Optional[pd.Series]:
+        """取出缓存中某只股票某个报告期的比率，未计算过时返回 None"""
+        with self._lock:
+            if self._ratios is None or (stock_code, report_date) not in self._ratios.index:
+                return None
+            return self._ratios.loc[(stock_code, report_date)].copy()
+
+    def invalidate(self, stock_codes: Optional[Iterable[str]] = None):
+        """丢弃指定股票(默认全部)的缓存结果"""
+        with self._lock:
+            if stock_codes is None or self._ratios is None:
+                self._fingerprints = _empty_fingerprints()
+                self._versions = {}
+                self._ratios = None
+                return
+            stock_codes = list(stock_codes)
+            self._fingerprints = self._fingerprints[
+                ~self._fingerprints.index.get_level_values('SECUCODE').isin(stock_codes)]
+            self._ratios = self._ratios[~self._ratios.index.get_level_values('SECUCODE').isin(stock_codes)]
+            for code in stock_codes:
+                self._versions.pop(code, None)
+
+    def cached_keys(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return [] if self._ratios is None else list(self._ratios.index)
+
+
+# 全局比率引擎
+ratio_engine = RatioEngine()
@@ -0,0 +1,194 @@
+"""全市场截面选股
+
+按报告期把比率表(及任意数值字段)拆成列式截面，并为每一列预先建立排序索引:
+- 区间条件(<, <=, >, >=, ==)在排序索引上二分查找，得到命中行后合并为布尔掩码
+- 排名直接沿排序索引取出命中的行，无需对结果再次排序
+
+用法:
+    screener = Screener.from_stores()
+    screener.screen('2024-03-31', "资产负债率 < 40% and 净利润同比 > 20%", sort_by='ROE', limit=50)
+"""
+import re
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+Condition = Tuple[str, str, float]
+
+_CONDITION_PATTERN = re.compile(r'^\s*(.+?)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)\s*(%?)\s*$')
+_AND_PATTERN = re.compile(r'\s+and\s+|\s*&\s*|\s*且\s*', re.IGNORECASE)
+
+
+def parse_conditions(query: str) -> List[Condition]:
+    """把 "资产负债率 < 40% and 净利润同比 > 20%" 解析为 [(列名, 运算符, 数值), ...]
+
+    带 % 的数值按百分比换算为小数，与比率表的单位一致
+    """
+    conditions = []
+    for part in _AND_PATTERN.split(query.strip()):
+        if not part:
+            continue
+        match = _CONDITION_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"无法解析筛选条件: {part}")
+        column, op, number, percent = match.groups()
+        value = float(number) / 100 if percent else float(number)
+        conditions.append((column, op, value))
+    return conditions
+
+
+class PeriodSection:
+    """单个报告期的列式截面及其排序索引"""
+
+    def __init__(self, report_date: str, frame: pd.DataFrame):
+        self.report_date = report_date
+        self.codes = frame.index.to_numpy()
+        self.columns: Dict[str, np.ndarray] = {
+            column: frame[column].to_numpy(dtype='float64') for column in frame.columns
+        }
+        # 列名 -> (升序数值, 对应行号)，NaN 不进入索引
+        self._sorted: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for column, values in self.columns.items():
+            valid = np.flatnonzero(~np.isnan(values))
+            order = valid[np.argsort(values[valid], kind='stable')]
+            self._sorted[column] = (values[order], order)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _column(self, column: str) -> Tuple[np.ndarray, np.ndarray]:
+        if column not in self._sorted:
+            raise KeyError(f"报告期 {self.report_date} 没有字段 {column}")
+        return self._sorted[column]
+
+    def match(self, column: str, op: str, value: float) -> np.ndarray:
+        """单个条件命中的行(布尔掩码)"""
+        sorted_values, order = self._column(column)
+        if op == '<':
+            rows = order[:np.searchsorted(sorted_values, value, side='left')]
+        elif op == '<=':
+            rows = order[:np.searchsorted(sorted_values, value, side='right')]
+        elif op == '>':
+            rows = order[np.searchsorted(sorted_values, value, side='right'):]
+        elif op == '>=':
+            rows = order[np.searchsorted(sorted_values, value, side='left'):]
+        elif op == '==':
+            rows = order[np.searchsorted(sorted_values, value, side='left'):
+                         np.searchsorted(sorted_values, value, side='right')]
+        elif op == '!=':
+            mask = np.zeros(len(self), dtype=bool)
+            mask[order] = True
+            mask[self.match(column, '==', value)] = False
+            return mask
+        else:
+            raise ValueError(f"不支持的运算符: {op}")
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def ranked(self, mask: np.ndarray, sort_by: str, ascending: bool = False) -> np.ndarray:
+        """沿 sort_by 的排序索引取出命中的行号，排序字段为 NaN 的行排在最后"""
+        _, order = self._column(sort_by)
+        rows = order[mask[order]]
+        if not ascending:
+            rows = rows[::-1]
+        missing = np.flatnonzero(mask & np.isnan(self.columns[sort_by]))
+        return np.concatenate([rows, missing])
+
+
+class Screener:
+    """按报告期索引的全市场选股器"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sections: Dict[str, PeriodSection] = {}
+
+    def load(self, table: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> int:
+        """用以 (SECUCODE, REPORT_DATE) 为索引的数值表重建全部截面，返回报告期数量
+
+        参数:
+            table: 如 RatioEngine.compute 的结果，可与 build_panel 的原始字段拼接后传入
+            columns: 只为这些列建立索引，默认全部数值列
+        """
+        if columns is not None:
+            table = table[list(columns)]
+        table = table.select_dtypes('number')
+        sections = {
+            str(report_date): PeriodSection(str(report_date), frame.droplevel('REPORT_DATE'))
+            for report_date, frame in table.groupby(level='REPORT_DATE', sort=True)
+        }
+        # 整体替换，查询中的调用方仍持有旧截面，不受重建影响
+        with self._lock:
+            self._sections = sections
+        return len(sections)
+
+    @classmethod
+    def from_stores(cls, engine=None) -> 'Screener':
+        """用采集模块内存仓库的数据构建选股器: 比率 + 原始字段"""
+        from data.analysis.ratio_engine import build_panel, ratio_engine
+        from data.collectors.get_balance_sheet import balance_sheet_store
+        from data.collectors.get_profit_sheet import profit_sheet_store
+        from data.collectors.statement_record import records_to_frame
+        from data.collectors.statement_schema import BALANCE_SCHEMA, PROFIT_SCHEMA
+
+        engine = engine or ratio_engine
+        balance = records_to_frame(balance_sheet_store.items(), BALANCE_SCHEMA)
+        profit = records_to_frame(profit_sheet_store.items(), PROFIT_SCHEMA)
+        ratios = engine.compute(balance, profit)
+
+        screener = cls()
+        screener.load(ratios.join(build_panel(balance, profit)))
+        return screener
+
+    def report_dates(self) -> List[str]:
+        with self._lock:
+            return list(self._sections)
+
+    def section(self, report_date: str) -> PeriodSection:
+        with self._lock:
+            if report_date not in self._sections:
+                raise KeyError(f"没有报告期 {report_date} 的数据")
+            return self._sections[report_date]
+
+    def screen(self, report_date: str,
+               conditions: Union[str, Sequence[Condition]] = (),
+               sort_by: Optional[str] = None,
+               ascending: bool = False,
+               limit: Optional[int] = None,
+               columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """筛选某个报告期满足全部条件的股票
+
+        参数:
+            report_date: 报告期(YYYY-MM-DD)
+            conditions: 条件字符串(见 parse_conditions)或 [(列名, 运算符, 数值), ...]
+            sort_by: 排名字段，默认按股票代码排序
+            ascending: 是否升序
+            limit: 最多返回多少只股票
+            columns: 结果中附带的字段，默认为条件字段和排名字段
+
+        返回:
+            以股票代码为索引的 DataFrame
+        """
+        if isinstance(conditions, str):
+            conditions = parse_conditions(conditions)
+        section = self.section(report_date)
+
+        mask = np.ones(len(section), dtype=bool)
+        for column, op, value in conditions:
+            mask &= section.match(column, op, value)
+
+        rows = section.ranked(mask, sort_by, ascending) if sort_by else np.flatnonzero(mask)
+        if limit is not None:
+            rows = rows[:limit]
+
+        if columns is None:
+            columns = list(dict.fromkeys([column for column, _, _ in conditions] + ([sort_by] if sort_by else [])))
+        result = pd.DataFrame(
+            {column: section.columns[column][rows] for column in columns},
+            index=pd.Index(section.codes[rows], name='股票代码')
+        )
+        if sort_by:
+            result.insert(0, '排名', np.arange(1, len(rows) + 1))
+        return result
@@ -1,21 +1,321 @@
+"""aktools 本地服务管理
+
+AktoolsSidecar 负责:
+- 已有实例在运行时直接复用，不重复启动
+- 启动后轮询就绪探针，服务可以响应请求后才返回
+- 后台线程监控进程，崩溃后自动重启(有次数上限)
+- workers > 1 时在相邻端口启动多个 aktools 进程，由本地轮询分发器统一对外提供 AKTOOLS_BASE_URL，
+  并发采集不会排队在单个服务进程后面
+
+Windows 下每个进程在新控制台窗口中运行，其他平台在独立会话中运行(不随终端信号退出)
+"""
+import atexit
+import itertools
+import logging
+import os
 import subprocess
 import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+import requests
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+# aktools 服务地址(可通过环境变量指向其他端口或本地模拟服务)
+AKTOOLS_BASE_URL = os.environ.get("AKTOOLS_BASE_URL", "http://127.0.0.1:8080")
+
+# 转发时不透传的逐跳头部
+_HOP_BY_HOP_HEADERS = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+                       'te', 'trailers', 'transfer-encoding', 'upgrade'}
+
+Command = Callable[[str, int], List[str]]
+
+
+def aktools_url(endpoint: str) -> str:
+    """aktools 公开接口的完整地址，如 aktools_url('stock_zcfz_em')"""
+    return f"{AKTOOLS_BASE_URL}/api/public/{endpoint}"
+
+
+def aktools_command(host: str, port: int) -> List[str]:
+    """启动单个 aktools 进程的命令行"""
+    return [sys.executable, "-m", "aktools", "--host", host, "--port", str(port)]
+
+
+def probe(base_url: str, timeout: float = 1.0) -> bool:
+    """就绪探针: 服务能返回任何非 5xx 响应即视为就绪"""
+    try:
+        response = requests.get(f"{base_url}/", timeout=timeout)
+    except requests.exceptions.RequestException:
+        return False
+    response.close()
+    return response.status_code < 500
 
-def run_aktools():
+
+class AktoolsWorker:
+    """单个 aktools 进程"""
+
+    def __init__(self, host: str, port: int, command: Command = aktools_command):
+        self.host = host
+        self.port = port
+        self.command = command
+        self.process: Optional[subprocess.Popen] = None
+        self.restarts = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        if sys.platform == "win32":
+            kwargs = {'creationflags': subprocess.CREATE_NEW_CONSOLE}
+        else:
+            kwargs = {'start_new_session': True, 'stdout': subprocess.DEVNULL}
+        self.process = subprocess.Popen(self.command(self.host, self.port), **kwargs)
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def wait_ready(self, timeout: float):
+        """轮询就绪探针，进程提前退出或超时则抛出 RuntimeError"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if not self.alive():
+                code = self.process.returncode if self.process is not None else None
+                raise RuntimeError(f"aktools 进程({self.base_url})已退出，返回码 {code}")
+            if probe(self.base_url):
+                return
+            time.sleep(0.2)
+        raise RuntimeError(f"aktools({self.base_url}) 在 {timeout} 秒内未就绪")
+
+    def stop(self, timeout: float = 5.0):
+        if not self.alive():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class RoundRobinDispatcher:
+    """本地轮询分发器: 把请求依次转发给各个 aktools 进程
+
+    某个后端连接失败时转到下一个后端重试，全部失败返回 502；响应体按块流式转发
     """
-    启动 python -m aktools 并在后台运行（不阻塞主程序）
+
+    def __init__(self, host: str, port: int, backends: List[str], timeout: float = 120.0,
+                 chunk_size: int = 64 * 1024):
+        self.backends = backends
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._cycle = itertools.cycle(range(len(backends)))
+        self._cycle_lock = threading.Lock()
+        self._local = threading.local()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def _session(self) -> requests.Session:
+        # 每个处理线程一个会话，复用到后端的连接
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.trust_env = False
+        return session
+
+    def _order(self) -> List[str]:
+        with self._cycle_lock:
+            first = next(self._cycle)
+        return self.backends[first:] + self.backends[:first]
+
+    def _handler_class(self):
+        dispatcher = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                for backend in dispatcher._order():
+                    try:
+                        response = dispatcher._session().get(f"{backend}{self.path}", stream=True,
+                                                             timeout=dispatcher.timeout)
+                    except requests.exceptions.ConnectionError:
+                        continue
+                    with response:
+                        try:
+                            self._relay(response)
+                        except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                            # 响应头已发出，无法再换后端或返回 502: 关闭连接，客户端会看到不完整的响应
+                            logger.warning("转发 %s%s 中途失败: %s", backend, self.path, e)
+                            self.close_connection = True
+                    return
+                self.send_error(502, "没有可用的 aktools 进程")
+
+            def _relay(self, response: requests.Response):
+                self.send_response(response.status_code)
+                chunked = 'content-length' not in response.headers
+                for name, value in response.headers.items():
+                    if name.lower() not in _HOP_BY_HOP_HEADERS:
+                        self.send_header(name, value)
+                if chunked:
+                    self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                # 原样转发(不解压)，保留后端的 Content-Encoding
+                for chunk in response.raw.stream(dispatcher.chunk_size, decode_content=False):
+                    if chunked:
+                        self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    else:
+                        self.wfile.write(chunk)
+                if chunked:
+                    # 只有完整转发后才写结束块，中途失败时客户端不会把截断的响应当作完整响应
+                    self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'RoundRobinDispatcher':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class AktoolsSidecar:
+    """托管的 aktools 服务
+
+    参数:
+        host, port: 对外服务地址，默认取自 AKTOOLS_BASE_URL
+        workers: aktools 进程数；大于 1 时进程监听 port+1 ~ port+workers，port 上运行轮询分发器
+        startup_timeout: 等待每个进程就绪的秒数
+        max_restarts: 每个进程崩溃后最多自动重启的次数
+        monitor_interval: 检查进程存活的间隔(秒)
+        command: 根据 (host, port) 生成进程命令行，默认 python -m aktools
     """
-    try:
-        # 在新控制台窗口中启动 aktools（Windows）
-        process = subprocess.Popen(
-            [sys.executable, "-m", "aktools"],
-            creationflags=subprocess.CREATE_NEW_CONSOLE
-        )
-        return process
-    except Exception as e:
-        print(f"启动 aktools 失败: {e}")
-        return None
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, workers: int = 1,
+                 startup_timeout: float = 60.0, max_restarts: int = 5, monitor_interval: float = 2.0,
+                 command: Command = aktools_command):
+        default = urlparse(AKTOOLS_BASE_URL)
+        self.host = host or default.hostname or "127.0.0.1"
+        self.port = port or default.port or 8080
+        if workers < 1:
+            raise ValueError("workers 至少为 1")
+        self.startup_timeout = startup_timeout
+        self.max_restarts = max_restarts
+        self.monitor_interval = monitor_interval
+        self.reused = False
+
+        ports = [self.port] if workers == 1 else [self.port + i for i in range(1, workers + 1)]
+        self.workers = [AktoolsWorker(self.host, worker_port, command) for worker_port in ports]
+        self.dispatcher: Optional[RoundRobinDispatcher] = None
+        self._stopped = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._atexit_registered = False
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> 'AktoolsSidecar':
+        """启动(或复用)服务，返回时服务已就绪"""
+        if probe(self.base_url):
+            self.reused = True
+            logger.info("复用已在运行的 aktools: %s", self.base_url)
+            return self
+
+        try:
+            for worker in self.workers:
+                if not probe(worker.base_url):
+                    worker.start()
+            for worker in self.workers:
+                if worker.alive():
+                    worker.wait_ready(self.startup_timeout)
+            if len(self.workers) > 1:
+                self.dispatcher = RoundRobinDispatcher(
+                    self.host, self.port, [worker.base_url for worker in self.workers]
+                ).start()
+        except Exception:
+            self.stop()
+            raise
+
+        self._stopped.clear()
+        self._monitor = threading.Thread(target=self._watch, daemon=True)
+        self._monitor.start()
+        # 多次 start/stop 时只注册一次退出处理
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+        logger.info("aktools 已就绪: %s(%d 个进程)", self.base_url, len(self.workers))
+        return self
+
+    def _watch(self):
+        """崩溃的进程自动重启，超过 max_restarts 次后放弃"""
+        while not self._stopped.wait(self.monitor_interval):
+            for worker in self.workers:
+                if worker.process is None or worker.alive() or self._stopped.is_set():
+                    continue
+                if worker.restarts >= self.max_restarts:
+                    continue
+                worker.restarts += 1
+                logger.warning("aktools 进程(%s)已退出(返回码 %s)，第 %d 次重启",
+                               worker.base_url, worker.process.returncode, worker.restarts)
+                try:
+                    worker.start()
+                    worker.wait_ready(self.startup_timeout)
+                except Exception as e:
+                    logger.error("重启 aktools 失败: %s", e)
+
+    def stop(self):
+        """停止自己启动的进程和分发器；复用的外部实例不受影响"""
+        self._stopped.set()
+        if self.dispatcher is not None:
+            self.dispatcher.stop()
+            self.dispatcher = None
+        for worker in self.workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_sidecar: Optional[AktoolsSidecar] = None
+_sidecar_lock = threading.Lock()
+
+
+def run_aktools(workers: int = 1, **kwargs) -> Optional[AktoolsSidecar]:
+    """
+    启动(或复用)aktools 并在后台运行（不阻塞主程序），返回时服务已就绪；失败时返回 None
+    """
+    global _sidecar
+    with _sidecar_lock:
+        if _sidecar is not None and probe(_sidecar.base_url):
+            return _sidecar
+        if _sidecar is not None:
+            # 旧实例已无响应，先停掉它的进程、分发器和监控线程，避免泄漏和端口占用
+            logger.warning("aktools 服务 %s 无响应，重新启动", _sidecar.base_url)
+            _sidecar.stop()
+            _sidecar = None
+        try:
+            _sidecar = AktoolsSidecar(workers=workers, **kwargs).start()
+        except Exception as e:
+            logger.error("启动 aktools 失败: %s", e)
+            _sidecar = None
+        return _sidecar
 
 # if __name__ == "__main__":
 #     # 启动 aktools
-#     aktools_process = run_aktools()
\ No newline at end of file
+#     aktools_process = run_aktools()
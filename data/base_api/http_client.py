@@ -0,0 +1,226 @@
+import json
+import logging
+import random
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterator, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from data.base_api.instrumentation import (CACHE_HITS, CACHE_MISSES, FETCH_ERRORS, FETCH_RETRIES,
+                                           FETCH_SECONDS, RESPONSE_BYTES)
+from data.base_api.response_cache import OfflineCacheMiss, endpoint_name, get_response_cache
+
+logger = logging.getLogger(__name__)
+
+# 需要重试的HTTP状态码(限流与服务端临时错误)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def _cacheable(data) -> bool:
+    """接口声明失败的响应是临时结果，不应缓存"""
+    return not (isinstance(data, dict) and data.get('success') is False)
+
+
+class TokenBucket:
+    """令牌桶限流器
+
+    以 rate 个/秒的速度补充令牌，最多积攒 capacity 个，允许短时突发
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """取出令牌，令牌不足时阻塞等待"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HttpClient:
+    """所有采集器共用的HTTP客户端
+
+    - 基于 requests.Session 的连接池与 keep-alive
+    - 默认的连接/读取超时
+    - 有上限的重试，指数退避加随机抖动
+    - 按主机的令牌桶限流
+    - use_response_cache 为 True 且全局磁盘响应缓存已开启时，get_json / iter_bytes 先查缓存(见 response_cache)
+    """
+
+    def __init__(self,
+                 timeout: Timeout = (5.0, 30.0),
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 pool_size: int = 32,
+                 host_rates: Optional[Dict[str, float]] = None,
+                 use_response_cache: bool = False):
+        self.timeout = timeout
+        self.use_response_cache = use_response_cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = Lock()
+        for host, rate in (host_rates or {}).items():
+            self.set_rate_limit(host, rate)
+
+    def set_rate_limit(self, host: str, rate: Optional[float], capacity: Optional[float] = None):
+        """设置某主机每秒请求数上限，rate 为 None 时取消限流"""
+        with self._buckets_lock:
+            if rate is None:
+                self._buckets.pop(host, None)
+            else:
+                self._buckets[host] = TokenBucket(rate, capacity)
+
+    def _backoff(self, attempt: int) -> float:
+        """带全抖动的指数退避时间"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[dict] = None, timeout: Optional[Timeout] = None,
+            **kwargs) -> requests.Response:
+        """发送GET请求
+
+        连接错误、超时以及 RETRY_STATUS_CODES 中的状态码会重试 max_retries 次，
+        重试用尽后抛出最后一次的异常或返回最后一次的响应
+        """
+        bucket = self._buckets.get(urlparse(url).hostname or "")
+        timeout = timeout if timeout is not None else self.timeout
+        endpoint = endpoint_name(url, params)
+
+        attempt = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                FETCH_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+                if attempt >= self.max_retries:
+                    FETCH_ERRORS.inc(endpoint=endpoint)
+                    raise
+                logger.debug("%s 第 %d 次请求失败，准备重试: %s", endpoint, attempt + 1, e)
+            else:
+                FETCH_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+                self._record_size(response, endpoint, kwargs.get('stream', False))
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    if response.status_code in RETRY_STATUS_CODES:
+                        FETCH_ERRORS.inc(endpoint=endpoint)
+                    return response
+                logger.debug("%s 返回 %d，准备重试", endpoint, response.status_code)
+                response.close()
+
+            FETCH_RETRIES.inc(endpoint=endpoint)
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    @staticmethod
+    def _record_size(response: requests.Response, endpoint: str, stream: bool):
+        """记录响应体字节数；流式响应只使用 Content-Length，不提前读取响应体"""
+        length = response.headers.get('Content-Length')
+        if length is not None and length.isdigit():
+            RESPONSE_BYTES.observe(int(length), endpoint=endpoint)
+        elif not stream:
+            RESPONSE_BYTES.observe(len(response.content), endpoint=endpoint)
+
+    def get_json(self, url: str, params: Optional[dict] = None, timeout: Optional[Timeout] = None,
+                 refresh: bool = False, stats: Optional[dict] = None, **kwargs):
+        """发送GET请求并解析JSON，HTTP错误时抛出 requests.HTTPError
+
+        启用响应缓存时优先返回缓存的响应(refresh=True 时跳过)，下载成功的原始响应体写入缓存；
+        接口声明失败的响应(success 为 false，如东方财富的“返回数据为空”)不写入缓存，下次重新请求；
+        离线模式下只读缓存，未命中抛出 OfflineCacheMiss(requests.RequestException 的子类)；
+        传入 stats 时在 stats['requests'] 中累计实际发出的网络请求数(缓存命中不计)
+        """
+        cache = get_response_cache() if self.use_response_cache else None
+        body = self._from_cache(cache, cache.get if cache else None, url, params, refresh)
+        if body is not None:
+            return json.loads(body)
+
+        if stats is not None:
+            stats['requests'] = stats.get('requests', 0) + 1
+        response = self.get(url, params=params, timeout=timeout, **kwargs)
+        response.raise_for_status()
+        data = response.json()
+        if cache is not None and _cacheable(data):
+            cache.put(url, params, response.content)
+        return data
+
+    def iter_bytes(self, url: str, params: Optional[dict] = None, timeout: Optional[Timeout] = None,
+                   refresh: bool = False, chunk_size: int = 64 * 1024, **kwargs) -> Iterator[bytes]:
+        """以流的方式逐块产出响应体(已解压)，适合不宜整体读入内存的大响应
+
+        缓存规则同 get_json: 命中时从缓存文件逐块读取；否则边下载边写入缓存，
+        只有完整读完响应体后才会保存(中途出错或提前停止迭代时不写入)
+        """
+        cache = get_response_cache() if self.use_response_cache else None
+        cached = self._from_cache(cache, cache.open if cache else None, url, params, refresh)
+        if cached is not None:
+            with cached:
+                while True:
+                    chunk = cached.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        endpoint = endpoint_name(url, params)
+        with self.get(url, params=params, timeout=timeout, stream=True, **kwargs) as response:
+            response.raise_for_status()
+            chunks = response.iter_content(chunk_size)
+            total = 0
+            if cache is None:
+                for chunk in chunks:
+                    total += len(chunk)
+                    yield chunk
+            else:
+                with cache.writer(url, params) as f:
+                    for chunk in chunks:
+                        total += len(chunk)
+                        f.write(chunk)
+                        yield chunk
+            # 没有 Content-Length 的流式响应在读完后记录实际字节数
+            if 'Content-Length' not in response.headers:
+                RESPONSE_BYTES.observe(total, endpoint=endpoint)
+
+    @staticmethod
+    def _from_cache(cache, read: Optional[Callable], url: str, params: Optional[dict], refresh: bool):
+        """按缓存规则读取(read 为 cache.get 或 cache.open)并记录命中/未命中，未命中返回 None"""
+        if cache is None or (refresh and not cache.offline):
+            return None
+        try:
+            cached = read(url, params)
+        except OfflineCacheMiss:
+            CACHE_MISSES.inc(endpoint=endpoint_name(url, params))
+            raise
+        if cached is not None:
+            CACHE_HITS.inc(endpoint=endpoint_name(url, params))
+        else:
+            CACHE_MISSES.inc(endpoint=endpoint_name(url, params))
+        return cached
+
+
+# 全局共享客户端(东方财富接口限流，本地 aktools 不限流；响应写入磁盘缓存)
+global_http_client = HttpClient(host_rates={"datacenter.eastmoney.com": 5.0}, use_response_cache=True)
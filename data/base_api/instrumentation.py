@@ -0,0 +1,238 @@
+"""采集流程的计数器、直方图和日志配置
+
+指标按接口(endpoint)或报表类型(statement)打标签，可导出为 Prometheus 文本格式或 JSON 快照:
+- collector_fetch_seconds: 单次 HTTP 请求耗时
+- collector_response_bytes: 响应体字节数
+- collector_fetch_retries_total / collector_fetch_errors_total: 重试次数 / 最终失败次数
+- collector_cache_hits_total / collector_cache_misses_total: 磁盘响应缓存命中 / 未命中
+- collector_parse_seconds / collector_rows_parsed_total: 解析耗时 / 解析行数
+
+各模块通过 logging.getLogger(__name__) 输出日志，参数延迟格式化，级别关闭时不产生开销
+"""
+import bisect
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# 默认日志级别，可通过环境变量 FINANCIAL_LOG_LEVEL 覆盖
+DEFAULT_LOG_LEVEL = os.environ.get("FINANCIAL_LOG_LEVEL", "INFO")
+# 设置后命令行入口结束时把指标写到该文件(.json 为 JSON，其余为 Prometheus 文本)
+DEFAULT_METRICS_PATH = os.environ.get("FINANCIAL_METRICS_PATH")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: LabelValues, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, help_text: str, labelnames: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _key(self, labels: Dict[str, object]) -> LabelValues:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+
+class Counter(_Metric):
+    """单调递增的计数器"""
+    kind = 'counter'
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Dict[LabelValues, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """固定分桶的直方图，记录每个桶的计数以及总和、总数"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labelnames, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签 -> [各桶计数(非累计，最后一个为 +Inf), 总和, 总数]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        if not self.registry.enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """记录 with 代码块的耗时(秒)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels) -> Optional[dict]:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return self._to_dict(state) if state is not None else None
+
+    def _to_dict(self, state: list) -> dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), state[0]):
+            running += count
+            cumulative['+Inf' if bound == float('inf') else repr(bound)] = running
+        return {'buckets': cumulative, 'sum': state[1], 'count': state[2]}
+
+    def samples(self) -> Dict[LabelValues, dict]:
+        with self._lock:
+            return {key: self._to_dict(state) for key, state in self._values.items()}
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """指标注册表；enabled 为 False 时所有记录操作直接返回"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式(exposition format 0.0.4)"""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for key, sample in sorted(metric.samples().items()):
+                if metric.kind == 'counter':
+                    lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {sample:g}")
+                    continue
+                for bound, count in sample['buckets'].items():
+                    labels = _format_labels(metric.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{metric.name}_bucket{labels} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(metric.labelnames, key)} {sample['sum']:g}")
+                lines.append(f"{metric.name}_count{_format_labels(metric.labelnames, key)} {sample['count']}")
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self) -> dict:
+        """JSON 快照: {指标名: {type, help, samples: [{labels, value | buckets/sum/count}]}}"""
+        snapshot = {'timestamp': time.time(), 'metrics': {}}
+        for metric in self.metrics():
+            samples = []
+            for key, sample in sorted(metric.samples().items()):
+                labels = dict(zip(metric.labelnames, key))
+                samples.append({'labels': labels, 'value': sample} if metric.kind == 'counter'
+                               else {'labels': labels, **sample})
+            snapshot['metrics'][metric.name] = {'type': metric.kind, 'help': metric.help, 'samples': samples}
+        return snapshot
+
+    def summary(self) -> str:
+        """便于阅读的汇总: 直方图给出次数、总和与均值，计数器给出累计值"""
+        lines = []
+        for metric in self.metrics():
+            for key, sample in sorted(metric.samples().items()):
+                name = f"{metric.name}{_format_labels(metric.labelnames, key)}"
+                if metric.kind == 'counter':
+                    lines.append(f"{name} {sample:g}")
+                else:
+                    mean = sample['sum'] / sample['count'] if sample['count'] else 0.0
+                    lines.append(f"{name} 次数 {sample['count']} 总和 {sample['sum']:.4g} 均值 {mean:.4g}")
+        return '\n'.join(lines)
+
+    def export(self, path: str):
+        """写出指标文件: .json 为 JSON 快照，其余为 Prometheus 文本格式"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, ensure_ascii=False, indent=2)
+            else:
+                f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        for metric in self.metrics():
+            metric.reset()
+
+
+# 全局指标注册表及采集流程的指标
+metrics = MetricsRegistry(enabled=os.environ.get("FINANCIAL_METRICS_DISABLED") != "1")
+
+FETCH_SECONDS = metrics.histogram('collector_fetch_seconds', "单次 HTTP 请求耗时(秒)", ('endpoint',))
+RESPONSE_BYTES = metrics.histogram('collector_response_bytes', "响应体字节数", ('endpoint',), BYTES_BUCKETS)
+FETCH_RETRIES = metrics.counter('collector_fetch_retries_total', "HTTP 请求重试次数", ('endpoint',))
+FETCH_ERRORS = metrics.counter('collector_fetch_errors_total', "重试用尽后仍失败的请求数", ('endpoint',))
+CACHE_HITS = metrics.counter('collector_cache_hits_total', "磁盘响应缓存命中次数", ('endpoint',))
+CACHE_MISSES = metrics.counter('collector_cache_misses_total', "磁盘响应缓存未命中次数", ('endpoint',))
+PARSE_SECONDS = metrics.histogram('collector_parse_seconds', "单个响应的解析耗时(秒)", ('statement',))
+ROWS_PARSED = metrics.counter('collector_rows_parsed_total', "解析的数据行数", ('statement',))
+
+
+def configure_logging(level: str = DEFAULT_LOG_LEVEL):
+    """命令行入口使用的日志配置: 输出到 stderr，级别可用 FINANCIAL_LOG_LEVEL 覆盖"""
+    logging.basicConfig(level=getattr(logging, str(level).upper(), logging.INFO),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
@@ -0,0 +1,97 @@
+"""JSON 数组的增量解析
+
+大响应(如 aktools 全市场快照)按块到达时逐个产出数组元素，不需要先把整个响应体读入内存:
+- 字节按 UTF-8 增量解码，多字节字符被切在两块之间也能正确处理
+- 每个元素用 json.JSONDecoder.raw_decode 解析，缓冲区只保留尚未解析完的部分
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+
+
+class _Buffer:
+    """待解析文本及当前位置"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """读入下一块(丢弃已解析的部分)，没有更多数据时返回 False"""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.text = self.text[self.pos:] + text
+                self.pos = 0
+                return True
+        # 结尾处不完整的 UTF-8 字符在这里报错；没有更多数据时缓冲区和位置保持不变
+        self._decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def skip_whitespace(self) -> bool:
+        """跳过空白，缓冲区内还有非空白字符时返回 True(必要时读入更多数据)"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return True
+            if not self.fill():
+                return False
+
+    def expect(self, char: str):
+        if not self.skip_whitespace():
+            raise json.JSONDecodeError(f"期望 {char!r}，数据已结束", self.text, self.pos)
+        if self.text[self.pos] != char:
+            raise json.JSONDecodeError(f"期望 {char!r}", self.text, self.pos)
+        self.pos += 1
+
+
+def iter_json_array(chunks: Iterable[bytes], decoder: json.JSONDecoder = json.JSONDecoder()) -> Iterator[Any]:
+    """逐个产出 JSON 数组的元素
+
+    参数:
+        chunks: 响应体字节块(如 requests.Response.iter_content)
+
+    顶层不是数组或数据不完整时抛出 json.JSONDecodeError(ValueError 的子类)
+    """
+    buffer = _Buffer(chunks)
+    buffer.expect('[')
+    first = True
+    while True:
+        if not buffer.skip_whitespace():
+            raise json.JSONDecodeError("数组未结束", buffer.text, buffer.pos)
+        if buffer.text[buffer.pos] == ']':
+            buffer.pos += 1
+            break
+        if not first:
+            buffer.expect(',')
+            buffer.skip_whitespace()
+        first = False
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer.text, buffer.pos)
+            except json.JSONDecodeError:
+                # 元素被切在块边界，读入更多数据后重试
+                if buffer.fill():
+                    continue
+                raise
+            # 元素之后应是分隔符；否则可能是被切开的数字(如 1. | 5e3)，读入更多数据后重新解析
+            if end < len(buffer.text) and buffer.text[end] in _DELIMITERS:
+                break
+            if not buffer.fill():
+                break
+        buffer.pos = end
+        yield value
+
+    if buffer.skip_whitespace():
+        raise json.JSONDecodeError("数组之后还有多余数据", buffer.text, buffer.pos)
@@ -0,0 +1,329 @@
+"""原始响应的磁盘缓存(按请求内容寻址，gzip 压缩)
+
+- 键: 规范化后的请求(主机 + 路径 + 排序后的查询参数，忽略 v 等易变参数)的 SHA-256
+- 文件: <root>/<键前两位>/<键>.gz，内容为一行请求元数据 JSON 加原始响应体
+- 新鲜度: 按接口(东方财富为 type 参数，aktools 为接口名)设置有效期，文件修改时间即下载时间
+- 容量: 总字节数超过 max_bytes 时按最近访问时间淘汰
+- 离线模式: 只从缓存读取(忽略有效期)，未命中时抛出 OfflineCacheMiss，不发网络请求
+- 流式读写: open / writer 逐块读取或写入响应体，大响应不必整体放入内存
+
+修改解析逻辑或采集中途崩溃后重新运行，已下载的响应直接从磁盘读取
+
+缓存默认关闭，需显式开启(RESPONSE_CACHE_ENABLED=1、enable_response_cache() 或 batch_collect --cache)。
+开启后在有效期内总是返回缓存的旧响应: 报表接口缓存 7 天，期间新披露或更正的报告期看不到，
+需要最新数据时用 refresh=True(增量同步默认如此)或清空缓存
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock, get_ident
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "RESPONSE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "response_cache")
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 2 * 1024 ** 3))  # 2GB
+DEFAULT_TTL: Optional[float] = 24 * 3600
+
+# 各接口的有效期(秒，None 表示永不过期)
+DEFAULT_POLICIES: Dict[str, Optional[float]] = {
+    'RPT_F10_FINANCE_GBALANCE': 7 * 24 * 3600,
+    'RPT_F10_FINANCE_GINCOMEQC': 7 * 24 * 3600,
+    'RPT_F10_FINANCE_GCASHFLOWQC': 7 * 24 * 3600,
+    'stock_zcfz_em': 24 * 3600,
+    'tool_trade_date_hist_sina': 7 * 24 * 3600,
+}
+
+# 不影响响应内容、不参与缓存键的查询参数
+IGNORED_PARAMS = {'v'}
+
+
+class OfflineCacheMiss(requests.exceptions.RequestException):
+    """离线模式下请求的响应不在缓存中"""
+
+
+def normalize_request(url: str, params: Optional[dict] = None) -> Tuple[str, List[Tuple[str, str]]]:
+    """合并 URL 自带的查询参数和 params，去掉易变参数后按名称排序"""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(str(key), str(value)) for key, value in (params or {}).items() if value is not None]
+    return f"{parts.netloc}{parts.path}", sorted(pair for pair in query if pair[0] not in IGNORED_PARAMS)
+
+
+def endpoint_name(url: str, params: Optional[dict] = None) -> str:
+    """接口名: 东方财富报表接口取 type 参数，其余取路径最后一段"""
+    _, query = normalize_request(url, params)
+    report_type = dict(query).get('type')
+    return report_type or urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def request_key(url: str, params: Optional[dict] = None) -> str:
+    location, query = normalize_request(url, params)
+    canonical = json.dumps([location, query], ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """按请求内容寻址的原始响应缓存"""
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 policies: Optional[Dict[str, Optional[float]]] = None, default_ttl: Optional[float] = DEFAULT_TTL,
+                 offline: bool = os.environ.get("RESPONSE_CACHE_OFFLINE") == "1", compresslevel: int = 6):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.policies = dict(DEFAULT_POLICIES if policies is None else policies)
+        self.default_ttl = default_ttl
+        self.offline = offline
+        self.compresslevel = compresslevel
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'writes': 0, 'evictions': 0}
+        # 路径 -> (字节数, 最近访问时间)，首次写入时扫描目录建立
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None
+        self._bytes = 0
+        self._lock = Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.gz")
+
+    def ttl(self, endpoint: str) -> Optional[float]:
+        return self.policies.get(endpoint, self.default_ttl)
+
+    def set_policy(self, endpoint: str, ttl: Optional[float]):
+        """设置某接口的有效期(秒)，None 表示永不过期"""
+        self.policies[endpoint] = ttl
+
+    def get(self, url: str, params: Optional[dict] = None) -> Optional[bytes]:
+        """读取缓存的响应体；未命中或已过期返回 None，离线模式未命中时抛出 OfflineCacheMiss"""
+        found = self._lookup(url, params)
+        if found is None:
+            return None
+        path, stat = found
+        try:
+            with gzip.open(path, 'rb') as f:
+                f.readline()  # 请求元数据
+                body = f.read()
+        except (OSError, EOFError):
+            # 写了一半或损坏的文件按未命中处理
+            return self._miss(url, params)
+        self._hit(path, stat)
+        return body
+
+    def open(self, url: str, params: Optional[dict] = None) -> Optional[IO[bytes]]:
+        """以流的方式读取缓存的响应体(解压后的文件对象，由调用方关闭)
+
+        未命中规则同 get；文件在读取过程中才发现损坏时由读取方抛出 OSError/EOFError
+        """
+        found = self._lookup(url, params)
+        if found is None:
+            return None
+        path, stat = found
+        try:
+            f = gzip.open(path, 'rb')
+            f.readline()  # 请求元数据
+        except (OSError, EOFError):
+            return self._miss(url, params)
+        self._hit(path, stat)
+        return f
+
+    def _lookup(self, url: str, params: Optional[dict]) -> Optional[Tuple[str, os.stat_result]]:
+        """缓存文件存在且未过期时返回 (路径, 文件状态)"""
+        path = self._path(request_key(url, params))
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return self._miss(url, params)
+
+        ttl = self.ttl(endpoint_name(url, params))
+        if not self.offline and ttl is not None and time.time() - stat.st_mtime > ttl:
+            with self._lock:
+                self._stats['stale'] += 1
+            return self._miss(url, params)
+        return path, stat
+
+    def _hit(self, path: str, stat: os.stat_result):
+        # 只更新访问时间，修改时间仍表示下载时间
+        now = time.time()
+        try:
+            os.utime(path, (now, stat.st_mtime))
+        except OSError:
+            pass
+        with self._lock:
+            self._stats['hits'] += 1
+            if self._index is not None and path in self._index:
+                self._index[path] = (self._index[path][0], now)
+
+    def _miss(self, url: str, params: Optional[dict]) -> None:
+        with self._lock:
+            self._stats['misses'] += 1
+        if self.offline:
+            raise OfflineCacheMiss(f"离线模式下缓存中没有该请求: {url} {params or ''}")
+        return None
+
+    def put(self, url: str, params: Optional[dict], body: bytes):
+        """保存响应体(先写临时文件再替换)"""
+        with self.writer(url, params) as f:
+            f.write(body)
+
+    @contextmanager
+    def writer(self, url: str, params: Optional[dict] = None) -> Iterator[IO[bytes]]:
+        """流式保存响应体: 在 with 代码块中逐块 write，正常结束后才替换为正式缓存文件；
+        代码块因异常(或外层生成器被提前关闭)退出时丢弃写了一半的临时文件
+        """
+        location, query = normalize_request(url, params)
+        path = self._path(request_key(url, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        meta = json.dumps({'url': location, 'params': query, 'endpoint': endpoint_name(url, params),
+                           'fetched_at': time.time()}, ensure_ascii=False)
+        tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+        f = gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel)
+        try:
+            f.write(meta.encode('utf-8') + b'\n')
+            yield f
+            f.close()
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+        os.replace(tmp_path, path)
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._stats['writes'] += 1
+            self._load_index_locked()
+            old = self._index.get(path)
+            self._bytes += size - (old[0] if old else 0)
+            self._index[path] = (size, time.time())
+            self._evict_locked(keep=path)
+
+    def _load_index_locked(self):
+        if self._index is not None:
+            return
+        self._index = {}
+        for path, stat in self._scan():
+            self._index[path] = (stat.st_size, stat.st_atime)
+        self._bytes = sum(size for size, _ in self._index.values())
+
+    def _scan(self) -> Iterator[Tuple[str, os.stat_result]]:
+        if not os.path.isdir(self.root):
+            return
+        for directory in os.scandir(self.root):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                if entry.name.endswith('.gz'):
+                    try:
+                        yield entry.path, entry.stat()
+                    except FileNotFoundError:
+                        continue
+
+    def _evict_locked(self, keep: Optional[str] = None):
+        """超出容量时从最久未访问的文件开始删除"""
+        if self._bytes <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._bytes <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self._index[path]
+            self._bytes -= size
+            self._stats['evictions'] += 1
+
+    def entries(self) -> Iterator[dict]:
+        """遍历缓存中的请求元数据(url/params/endpoint/fetched_at)"""
+        for path, _ in self._scan():
+            try:
+                with gzip.open(path, 'rb') as f:
+                    yield json.loads(f.readline())
+            except (OSError, EOFError, ValueError):
+                continue
+
+    @contextmanager
+    def offline_mode(self):
+        """临时切换为离线模式"""
+        previous, self.offline = self.offline, True
+        try:
+            yield self
+        finally:
+            self.offline = previous
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            self._load_index_locked()
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._index),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def clear(self):
+        """删除全部缓存文件"""
+        with self._lock:
+            for path, _ in list(self._scan()):
+                os.remove(path)
+            self._index = {}
+            self._bytes = 0
+
+
+_global_cache: Optional[ResponseCache] = None
+# 默认关闭；离线模式只能从缓存读取，同样视为开启
+_cache_disabled = not (os.environ.get("RESPONSE_CACHE_ENABLED") == "1"
+                       or os.environ.get("RESPONSE_CACHE_OFFLINE") == "1")
+_cache_lock = Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """获取全局响应缓存(首次调用时创建)，未开启时返回 None"""
+    global _global_cache
+    with _cache_lock:
+        if _cache_disabled:
+            return None
+        if _global_cache is None:
+            _global_cache = ResponseCache()
+        return _global_cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]):
+    """替换全局响应缓存，传入 None 则禁用缓存"""
+    global _global_cache, _cache_disabled
+    with _cache_lock:
+        _global_cache = cache
+        _cache_disabled = cache is None
+
+
+def enable_response_cache() -> ResponseCache:
+    """开启全局响应缓存并返回它(已开启时返回现有实例)"""
+    global _global_cache, _cache_disabled
+    with _cache_lock:
+        if _global_cache is None:
+            _global_cache = ResponseCache()
+        _cache_disabled = False
+        return _global_cache
+
+
+@contextmanager
+def use_response_cache(cache: Optional[ResponseCache]) -> Iterator[Optional[ResponseCache]]:
+    """临时替换全局响应缓存(None 表示禁用)，退出时恢复原来的实例和禁用状态"""
+    global _global_cache, _cache_disabled
+    with _cache_lock:
+        previous = (_global_cache, _cache_disabled)
+    set_response_cache(cache)
+    try:
+        yield cache
+    finally:
+        with _cache_lock:
+            _global_cache, _cache_disabled = previous
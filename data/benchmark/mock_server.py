@@ -0,0 +1,422 @@
+"""东方财富数据中心和 aktools 的本地模拟服务
+
+按请求参数回放报表数据，并可配置每个请求的延迟，用于离线基准测试:
+- /securities/api/data/get                 RPT_F10_FINANCE_GBALANCE / RPT_F10_FINANCE_GINCOMEQC，
+                                           支持 SECUCODE/REPORT_DATE 过滤和 p/ps 分页
+- /api/public/stock_zcfz_em                全市场资产负债表快照
+- /api/public/tool_trade_date_hist_sina    交易日历(工作日)
+- /__stats?reset=1                         已处理的请求数和字节数(可同时清零)
+
+fixtures 目录中存在 <报表类型>.json / stock_zcfz_em.json 时回放录制的真实响应
+(报表数据行作为模板，按请求的股票代码和报告期改写)，否则使用随机生成的数据
+
+用法:
+    python -m data.benchmark.mock_server --port 18080 --latency 0.05
+    EASTMONEY_API_URL=http://127.0.0.1:18080/securities/api/data/get \\
+    AKTOOLS_BASE_URL=http://127.0.0.1:18080 python -m data.serveie.batch_collect ...
+
+    python -m data.benchmark.mock_server --record fixtures/   # 录制一份真实响应
+"""
+import abc
+import argparse
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import requests
+
+from data.collectors.report_calendar import report_calendar
+from data.collectors.statement_engine import statement_engine
+from data.collectors.statement_schema import Schema, schema_keys
+
+EASTMONEY_PATH = '/securities/api/data/get'
+AKTOOLS_PATH = '/api/public/'
+STATS_PATH = '/__stats'
+
+# 报表类型 -> 字段定义
+REPORT_SCHEMAS: Dict[str, Schema] = {
+    descriptor.report_type: descriptor.schema for descriptor in statement_engine.statements.values()
+}
+
+# 未指定报告期时每只股票返回的报告期数量
+DEFAULT_PERIODS = 8
+
+_CODES_PATTERN = re.compile(r'SECUCODE(?:=| in )\(?([^)]*)\)')
+_DATES_IN_PATTERN = re.compile(r"REPORT_DATE in \(([^)]*)\)")
+_DATE_BOUND_PATTERN = re.compile(r"REPORT_DATE(>=|<=)'(\d{4}-\d{2}-\d{2})'")
+
+
+def parse_report_filter(filter_str: str) -> Tuple[List[str], List[str]]:
+    """从 filter 参数中取出股票代码和报告期(与 build_report_filter 的格式对应)"""
+    codes_match = _CODES_PATTERN.search(filter_str)
+    codes = re.findall(r'"([^"]+)"', codes_match.group(1)) if codes_match else []
+
+    dates_match = _DATES_IN_PATTERN.search(filter_str)
+    if dates_match:
+        return codes, re.findall(r"'([^']+)'", dates_match.group(1))
+
+    bounds = dict(_DATE_BOUND_PATTERN.findall(filter_str))
+    all_dates = report_calendar.report_dates
+    end = np.datetime64(bounds['<='], 'D') if '<=' in bounds else report_calendar.closest(date.today())
+    if '>=' in bounds:
+        selected = all_dates[(all_dates >= np.datetime64(bounds['>='], 'D')) & (all_dates <= end)]
+    else:
+        selected = all_dates[all_dates <= end][-DEFAULT_PERIODS:]
+    return codes, [str(day) for day in selected]
+
+
+def synthetic_rows(schema: Schema, rows: int = 20, seed: int = 0) -> List[dict]:
+    """随机生成的报表数据行模板(约三成字段为 None)"""
+    rng = random.Random(seed)
+    return [
+        {key: None if rng.random() < 0.3 else rng.uniform(-1e10, 1e10) for key in schema_keys(schema)}
+        for _ in range(rows)
+    ]
+
+
+def synthetic_snapshot(market_size: int, seed: int = 0) -> List[dict]:
+    """随机生成的 stock_zcfz_em 全市场快照"""
+    rng = random.Random(seed)
+    prefixes = ['600', '601', '603', '688', '000', '002', '300']
+    rows = []
+    for i in range(market_size):
+        total_assets = rng.uniform(1e8, 1e12)
+        total_liabilities = total_assets * rng.uniform(0.1, 0.9)
+        rows.append({
+            '序号': i + 1,
+            '股票代码': f"{prefixes[i % len(prefixes)]}{i // len(prefixes):03d}",
+            '股票简称': f"股票{i}",
+            '资产-货币资金': total_assets * rng.uniform(0.05, 0.3),
+            '资产-应收账款': total_assets * rng.uniform(0, 0.2),
+            '资产-存货': total_assets * rng.uniform(0, 0.3),
+            '资产-总资产': total_assets,
+            '资产-总资产同比': rng.uniform(-30, 60),
+            '负债-应付账款': total_liabilities * rng.uniform(0, 0.4),
+            '负债-预收账款': total_liabilities * rng.uniform(0, 0.1),
+            '负债-总负债': total_liabilities,
+            '负债-总负债同比': rng.uniform(-30, 60),
+            '资产负债率': total_liabilities / total_assets * 100,
+            '股东权益合计': total_assets - total_liabilities,
+            '公告日期': '2024-04-28T00:00:00.000',
+        })
+    return rows
+
+
+class MockDataSource:
+    """模拟服务的数据来源: 录制的响应或随机数据"""
+
+    def __init__(self, fixtures_dir: Optional[str] = None, market_size: int = 5000):
+        self.templates: Dict[str, List[dict]] = {}
+        for report_type, schema in REPORT_SCHEMAS.items():
+            recorded = self._load(fixtures_dir, f"{report_type}.json")
+            rows = ((recorded or {}).get('result') or {}).get('data')
+            self.templates[report_type] = rows or synthetic_rows(schema)
+        self.snapshot = self._load(fixtures_dir, 'stock_zcfz_em.json') or synthetic_snapshot(market_size)
+
+    @staticmethod
+    def _load(fixtures_dir: Optional[str], name: str):
+        if not fixtures_dir:
+            return None
+        path = os.path.join(fixtures_dir, name)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def report(self, report_type: str, filter_str: str, page: int, page_size: int) -> dict:
+        templates = self.templates.get(report_type)
+        codes, report_dates = parse_report_filter(filter_str)
+        if not templates or not codes or not report_dates:
+            return {'version': None, 'result': None, 'success': False, 'message': '返回数据为空', 'code': 9201}
+
+        # 与请求的排序一致: 按报告期倒序，同一报告期按股票代码升序
+        rows = []
+        for report_date in sorted(report_dates, reverse=True):
+            for code in sorted(codes):
+                row = dict(templates[len(rows) % len(templates)])
+                row.update({
+                    'SECUCODE': code,
+                    'SECURITY_CODE': code.split('.')[0],
+                    'SECURITY_NAME_ABBR': row.get('SECURITY_NAME_ABBR') or '模拟股票',
+                    'REPORT_DATE': f"{report_date} 00:00:00",
+                    'NOTICE_DATE': f"{report_date} 00:00:00",
+                })
+                rows.append(row)
+
+        pages = (len(rows) + page_size - 1) // page_size
+        data = rows[(page - 1) * page_size:page * page_size]
+        if not data:
+            return {'version': None, 'result': None, 'success': False, 'message': '返回数据为空', 'code': 9201}
+        return {'version': None, 'result': {'pages': pages, 'data': data, 'count': len(rows)},
+                'success': True, 'message': 'ok', 'code': 0}
+
+    def trade_dates(self) -> List[dict]:
+        days = np.arange(np.datetime64('1990-12-19'), np.datetime64(f"{date.today().year + 1}-12-31"))
+        return [{'trade_date': str(day)} for day in days[np.is_busday(days)]]
+
+
+class _MockEndpoint(abc.ABC):
+    """模拟服务的公共部分: 接口地址和地址替换；子类需实现 base_url / start / stop"""
+
+    _installed: Dict[str, str] = {}
+
+    @property
+    @abc.abstractmethod
+    def base_url(self) -> str:
+        """服务地址，如 http://127.0.0.1:18080"""
+
+    @property
+    def eastmoney_url(self) -> str:
+        return f"{self.base_url}{EASTMONEY_PATH}"
+
+    def install(self):
+        """把东方财富和 aktools 接口地址指向本服务(stop 时恢复)"""
+        from data.base_api import aktools_runner
+        from data.collectors import eastmoney_api
+
+        self._installed = {
+            'eastmoney': eastmoney_api.EASTMONEY_API_URL,
+            'aktools': aktools_runner.AKTOOLS_BASE_URL,
+        }
+        eastmoney_api.EASTMONEY_API_URL = self.eastmoney_url
+        aktools_runner.AKTOOLS_BASE_URL = self.base_url
+
+    def uninstall(self):
+        if not self._installed:
+            return
+        from data.base_api import aktools_runner
+        from data.collectors import eastmoney_api
+
+        eastmoney_api.EASTMONEY_API_URL = self._installed['eastmoney']
+        aktools_runner.AKTOOLS_BASE_URL = self._installed['aktools']
+        self._installed = {}
+
+    @abc.abstractmethod
+    def start(self) -> '_MockEndpoint':
+        """启动服务，返回 self"""
+
+    @abc.abstractmethod
+    def stop(self):
+        """停止服务并恢复接口地址"""
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MockServer(_MockEndpoint):
+    """在后台线程中运行的模拟服务
+
+    与采集代码共享同一个解释器(GIL)，适合功能测试；测量并发吞吐量时使用 MockServerProcess
+
+    用法:
+        with MockServer(latency=0.05) as server:
+            server.install()    # 把采集模块的接口地址指向模拟服务
+            ...
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, fixtures_dir: Optional[str] = None, market_size: int = 5000):
+        self.latency = latency
+        self.jitter = jitter
+        self.source = MockDataSource(fixtures_dir, market_size)
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                if parsed.path == STATS_PATH:
+                    self._reply(server.stats(reset=params.get('reset') == '1'))
+                    return
+                payload = server.route(parsed.path, params)
+                if payload is None:
+                    self.send_error(404)
+                    return
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + random.uniform(0, server.jitter))
+                size = self._reply(payload)
+                with server._lock:
+                    server.requests += 1
+                    server.bytes_sent += size
+
+            def _reply(self, payload) -> int:
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def route(self, path: str, params: Dict[str, str]):
+        if path == EASTMONEY_PATH:
+            return self.source.report(params.get('type', ''), params.get('filter', ''),
+                                      int(params.get('p', 1)), int(params.get('ps', 50)))
+        if path == f"{AKTOOLS_PATH}stock_zcfz_em":
+            return self.source.snapshot
+        if path == f"{AKTOOLS_PATH}tool_trade_date_hist_sina":
+            return self.source.trade_dates()
+        return None
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        with self._lock:
+            stats = {'requests': self.requests, 'bytes_sent': self.bytes_sent}
+            if reset:
+                self.requests = 0
+                self.bytes_sent = 0
+        return stats
+
+    def reset_stats(self):
+        self.stats(reset=True)
+
+    def start(self) -> 'MockServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.uninstall()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+class MockServerProcess(_MockEndpoint):
+    """在独立子进程中运行的模拟服务，服务端开销不占用采集进程的 GIL"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 fixtures_dir: Optional[str] = None, market_size: int = 5000, startup_timeout: float = 15.0):
+        self.args = ['--latency', str(latency), '--jitter', str(jitter), '--market-size', str(market_size)]
+        if fixtures_dir:
+            self.args += ['--fixtures', fixtures_dir]
+        self.startup_timeout = startup_timeout
+        self.port = _free_port()
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def stats(self, reset: bool = False) -> Dict[str, int]:
+        response = requests.get(f"{self.base_url}{STATS_PATH}", params={'reset': int(reset)}, timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    @property
+    def requests(self) -> int:
+        return self.stats()['requests']
+
+    def reset_stats(self):
+        self.stats(reset=True)
+
+    def start(self) -> 'MockServerProcess':
+        self._process = subprocess.Popen(
+            [sys.executable, '-m', 'data.benchmark.mock_server', '--port', str(self.port)] + self.args,
+            stdout=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"模拟服务进程已退出(返回码 {self._process.returncode})")
+            try:
+                self.stats()
+                return self
+            except requests.exceptions.RequestException:
+                time.sleep(0.05)
+        self.stop()
+        raise RuntimeError(f"模拟服务在 {self.startup_timeout} 秒内未就绪")
+
+    def stop(self):
+        self.uninstall()
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait(timeout=5)
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def record_fixtures(directory: str, stock_code: str = '600519.SH', target_date: str = '2024-05-01'):
+    """从真实接口录制一份原始响应，供模拟服务回放
+
+    直接请求接口(refresh=True)，不经过本地仓库和磁盘响应缓存，录到的一定是接口当前返回的数据
+    """
+    from data.base_api import aktools_runner
+    from data.base_api.http_client import global_http_client
+    from data.base_api.response_cache import use_response_cache
+    from data.collectors.eastmoney_api import build_report_filter, build_report_url
+
+    os.makedirs(directory, exist_ok=True)
+    report_date = report_calendar.closest_report_date(target_date)
+    report_dates = report_calendar.previous_report_dates(report_date)
+    with use_response_cache(None):
+        for descriptor in statement_engine.statements.values():
+            url = build_report_url(descriptor.report_type, descriptor.sty,
+                                   build_report_filter([stock_code], report_dates),
+                                   page=1, page_size=len(report_dates))
+            response_data = global_http_client.get_json(url, refresh=True)
+            with open(os.path.join(directory, f"{descriptor.report_type}.json"), 'w', encoding='utf-8') as f:
+                json.dump(response_data, f, ensure_ascii=False)
+
+        snapshot = global_http_client.get_json(aktools_runner.aktools_url('stock_zcfz_em'),
+                                               params={'date': report_date.replace('-', '')}, refresh=True)
+    with open(os.path.join(directory, 'stock_zcfz_em.json'), 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    print(f"已录制到 {directory}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="东方财富/aktools 本地模拟服务")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--latency', type=float, default=0.0, help="每个请求的固定延迟(秒)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="额外的随机延迟上限(秒)")
+    parser.add_argument('--fixtures', help="录制响应所在目录")
+    parser.add_argument('--market-size', type=int, default=5000, help="随机全市场快照的股票数量")
+    parser.add_argument('--record', metavar='DIR', help="从真实接口录制响应到该目录后退出")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.record)
+    else:
+        server = MockServer(args.host, args.port, args.latency, args.jitter, args.fixtures, args.market_size)
+        print(f"模拟服务已启动: {server.base_url}")
+        print(f"  EASTMONEY_API_URL={server.eastmoney_url}")
+        print(f"  AKTOOLS_BASE_URL={server.base_url}")
+        try:
+            server._httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
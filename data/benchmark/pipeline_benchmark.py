@@ -0,0 +1,136 @@
+"""端到端采集性能基准(离线，基于本地模拟服务)
+
+测量各种采集方式的吞吐量，便于发现性能回退并比较批量、并发和缓存模式:
+- 逐只股票请求: get_financial_balance_data 请求/秒
+- 并发请求: run_collection 股票/秒
+- 批量请求: get_financial_balance_data_batch 股票/秒
+- 解析: parse_financial_balance_data / parse_financial_profit_data 行/秒，以及每只股票的内存占用
+- aktools 快照: stock_balance_sheet.get_balance_sheet 冷启动耗时和缓存命中后的查询/秒
+
+模拟服务默认在独立子进程中运行，避免服务端开销与采集代码争用 GIL
+
+用法:
+    python -m data.benchmark.pipeline_benchmark --stocks 200 --latency 0.02 --concurrency 16
+    python -m data.benchmark.pipeline_benchmark --json results.json   # 保存结果用于对比
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from data.base_api import aktools_runner
+from data.base_api.http_client import global_http_client
+from data.base_api.response_cache import use_response_cache
+from data.benchmark.mock_server import MockServer, MockServerProcess
+from data.collectors import get_balance_sheet, get_profit_sheet, stock_balance_sheet
+from data.collectors.statement_engine import statement_engine
+from data.collectors.china_stock_input import ChinaStockValidator
+from data.database.datebase import use_warehouse
+from data.serveie.async_collection import run_collection
+
+TARGET_DATE = '2024-05-01'
+HISTORY_START = '2020-01-01'
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()
+    return time.perf_counter() - start
+
+
+def clear_stores():
+    for descriptor in statement_engine.statements.values():
+        descriptor.store.clear()
+    stock_balance_sheet.global_store.clear()
+
+
+def run(stocks: int, latency: float, concurrency: int, fixtures_dir: str = None,
+        in_process: bool = False) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    server_class = MockServer if in_process else MockServerProcess
+    # 只测量采集和解析，不写本地数据库，也不读写磁盘响应缓存；结束后恢复原来的全局实例
+    with use_warehouse(None), use_response_cache(None), \
+            server_class(latency=latency, fixtures_dir=fixtures_dir, market_size=max(stocks, 100)) as server:
+        server.install()
+        snapshot = global_http_client.get_json(aktools_runner.aktools_url('stock_zcfz_em'))
+        raw_codes = [row['股票代码'] for row in snapshot[:stocks]]
+        valid, standardized, _ = ChinaStockValidator().validate_tickers(raw_codes)
+        codes: List[str] = standardized[valid].tolist()
+
+        # 逐只股票请求
+        clear_stores()
+        server.reset_stats()
+        elapsed = timed(lambda: [get_balance_sheet.get_financial_balance_data(code, TARGET_DATE) for code in codes])
+        results['逐只请求'] = {'请求/秒': server.requests / elapsed, '股票/秒': len(codes) / elapsed}
+
+        # 并发请求(全部报表)
+        clear_stores()
+        server.reset_stats()
+        elapsed = timed(lambda: run_collection(codes, TARGET_DATE, concurrency=concurrency))
+        results['并发请求'] = {'请求/秒': server.requests / elapsed, '股票/秒': len(codes) / elapsed}
+
+        # 批量请求
+        server.reset_stats()
+        responses = {}
+        elapsed = timed(lambda: responses.update(
+            get_balance_sheet.get_financial_balance_data_batch(codes, HISTORY_START, TARGET_DATE)))
+        results['批量请求'] = {'请求/秒': server.requests / elapsed, '股票/秒': len(codes) / elapsed,
+                              '请求数': server.requests}
+
+        # 解析吞吐量和内存
+        profit_responses = get_profit_sheet.get_financial_Profit_data_batch(codes, HISTORY_START, TARGET_DATE)
+        for label, parser, batch in (('解析资产负债表', get_balance_sheet.parse_financial_balance_data, responses),
+                                     ('解析利润表', get_profit_sheet.parse_financial_profit_data, profit_responses)):
+            rows = sum(len((response.get('result') or {}).get('data') or []) for response in batch.values())
+            clear_stores()
+            elapsed = timed(lambda: [parser(response) for response in batch.values()])
+            clear_stores()
+            gc.collect()
+            tracemalloc.start()
+            timed(lambda: [parser(response) for response in batch.values()])
+            retained, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[label] = {'行/秒': rows / elapsed, '字节/股票': retained / max(len(codes), 1)}
+
+        # aktools 全市场快照: 首次查询下载快照，之后全部命中内存
+        clear_stores()
+        server.reset_stats()
+        snapshot_date = TARGET_DATE[:4] + '0331'
+        cold = timed(lambda: stock_balance_sheet.get_balance_sheet(codes[0], snapshot_date))
+        warm = timed(lambda: [stock_balance_sheet.get_balance_sheet(code, snapshot_date) for code in codes])
+        hot = timed(lambda: [stock_balance_sheet.get_balance_sheet(code, snapshot_date, copy=False) for code in codes])
+        results['aktools快照'] = {'冷启动秒': cold, '首次查询/秒': len(codes) / warm,
+                                 '缓存查询/秒': len(codes) / hot, '请求数': server.requests}
+
+    clear_stores()
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]]):
+    for case, metrics in results.items():
+        values = '   '.join(f"{name} {value:,.2f}" if isinstance(value, float) else f"{name} {value}"
+                           for name, value in metrics.items())
+        print(f"{case:<10} {values}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="端到端采集性能基准(本地模拟服务)")
+    parser.add_argument('--stocks', type=int, default=200, help="股票数量")
+    parser.add_argument('--latency', type=float, default=0.02, help="模拟服务每个请求的延迟(秒)")
+    parser.add_argument('--concurrency', type=int, default=16, help="并发请求数")
+    parser.add_argument('--fixtures', help="录制响应所在目录(见 mock_server --record)")
+    parser.add_argument('--in-process', action='store_true', help="在当前进程内运行模拟服务(与采集代码共享 GIL)")
+    parser.add_argument('--json', help="把结果保存为 JSON 文件")
+    args = parser.parse_args()
+
+    results = run(args.stocks, args.latency, args.concurrency, args.fixtures, args.in_process)
+    print(f"\n=== {args.stocks} 只股票，延迟 {args.latency * 1000:.0f}ms，并发 {args.concurrency} ===")
+    print_results(results)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'params': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
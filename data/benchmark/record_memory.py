@@ -0,0 +1,52 @@
+"""单期报表记录的内存占用对比: 嵌套字典 vs StatementRecord vs DataFrame
+
+用法:
+    python -m data.benchmark.record_memory --rows 5000
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable
+
+from data.benchmark.parse_benchmark import make_response
+from data.collectors.statement_record import parse_statement_compact
+from data.collectors.statement_schema import BALANCE_SCHEMA, PROFIT_SCHEMA, parse_statement_frame, parse_statement_records
+
+# 全市场规模: 5000 只股票 x 40 个季度
+MARKET_RECORDS = 5000 * 40
+
+
+def measure_memory(build: Callable[[], object]) -> int:
+    """构建结果在解析结束后仍然占用的字节数
+
+    响应在追踪期间生成并在解析后释放，嵌套字典引用的数值对象因此会计入其占用
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def run(rows: int):
+    for name, schema in (('资产负债表', BALANCE_SCHEMA), ('利润表', PROFIT_SCHEMA)):
+        cases = [
+            ('嵌套字典', lambda: parse_statement_records(make_response(schema, rows), schema)),
+            ('StatementRecord', lambda: parse_statement_compact(make_response(schema, rows), schema)),
+            ('DataFrame', lambda: parse_statement_frame(make_response(schema, rows), schema)),
+        ]
+        print(f"\n=== {name}: {rows} 条记录 ===")
+        for label, build in cases:
+            per_record = measure_memory(build) / rows
+            market_gb = per_record * MARKET_RECORDS / 1024 ** 3
+            print(f"{label:<16} {per_record:>10,.0f} 字节/条   全市场(5000x40) 约 {market_gb:6.2f} GB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="报表记录内存占用对比")
+    parser.add_argument('--rows', type=int, default=5000, help="模拟记录条数")
+    args = parser.parse_args()
+    run(args.rows)
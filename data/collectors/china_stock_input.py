@@ -1,6 +1,22 @@
 import re
 from datetime import datetime
-from typing import Tuple, Optional
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data.collectors.trading_calendar import TradingCalendar, get_trading_calendar
+
+ArrayLike = Union[Iterable[str], pd.Series, np.ndarray]
+
+
+def _first_match(conditions, values) -> pa.Array:
+    """逐行取第一个成立条件对应的值，均不成立时为 null"""
+    names = [str(i) for i in range(len(conditions))]
+    return pc.case_when(pc.make_struct(*conditions, field_names=names), *values)
+
 
 # 声明全局变量
 global_ticker = ""
@@ -9,7 +25,7 @@ global_date_std = ""
 class ChinaStockValidator:
     """中国沪深股市股票代码和日期验证器"""
 
-    def __init__(self):
+    def __init__(self, trading_calendar: Optional[TradingCalendar] = None):
         # 定义各市场代码规则
         self.market_rules = {
             'SH': {  # 上海证券交易所
@@ -29,11 +45,17 @@ class ChinaStockValidator:
             }
         }
 
-        # 交易日历(示例，实际应用中应该使用完整的交易日历)
-        self.trading_days = {
-            '2023-01-03', '2023-01-04', '2023-01-05',  # 示例日期
-            '2023-04-27', '2023-04-28', '2023-05-04'  # 示例日期
-        }
+        # 预编译各市场代码规则
+        self.compiled_rules = {market: re.compile(rule['pattern']) for market, rule in self.market_rules.items()}
+
+        # 交易日历(首次检查交易日时加载，见 trading_calendar)
+        self._trading_calendar = trading_calendar
+
+    @property
+    def trading_calendar(self) -> TradingCalendar:
+        if self._trading_calendar is None:
+            self._trading_calendar = get_trading_calendar()
+        return self._trading_calendar
 
     def validate_ticker(self, raw_input: str) -> Tuple[bool, Optional[str], Optional[str]]:
         """验证并标准化沪深股票代码
@@ -87,7 +109,7 @@ class ChinaStockValidator:
         if not market_rule:
             return False, None, f"未知市场类型: {suffix}"
 
-        if not re.match(market_rule['pattern'], code_part):
+        if not self.compiled_rules[suffix].match(code_part):
             return False, None, market_rule['description']
 
         # 7. 返回标准化代码
@@ -118,7 +140,7 @@ class ChinaStockValidator:
                 return False, None, "日期过早，中国股市始于1990年"
 
             # 4. 检查是否为交易日(如果需要)
-            if check_trading_day and date_str not in self.trading_days:
+            if check_trading_day and not self.trading_calendar.is_trading_day(date_obj):
                 return False, None, "该日期不是交易日"
 
             # 5. 返回标准化的日期字符串
@@ -127,6 +149,99 @@ class ChinaStockValidator:
         except ValueError:
             return False, None, "日期格式不正确，请使用YYYY-MM-DD格式"
 
+    def validate_tickers(self, raw_inputs: ArrayLike) -> Tuple[np.ndarray, pd.Series, pd.Series]:
+        """批量验证并标准化股票代码，规则和错误信息与 validate_ticker 完全一致
+
+        清洗、拆分后缀、长度/数字检查、市场判断和代码规则匹配都由 Arrow 计算函数整列完成，
+        中间结果不产生逐行的 Python 对象
+
+        参数:
+            raw_inputs: 原始股票代码列表/Series/数组(可带或不带后缀)
+
+        返回:
+            tuple: (是否有效的布尔数组, 标准化代码 Series, 错误信息 Series)，无效行的标准化代码为 None，
+                   有效行的错误信息为 None；Series 保留输入 Series 的索引
+        """
+        raw = raw_inputs if isinstance(raw_inputs, pd.Series) else pd.Series(list(raw_inputs), dtype='object')
+        strings = pa.array(raw.to_numpy(dtype=object), type=pa.string(), from_pandas=True).fill_null('')
+        cleaned = pc.utf8_upper(pc.utf8_trim_whitespace(strings))
+
+        # 分离代码和后缀: 末尾补一个 '.' 保证每行至少拆出两段
+        parts = pc.split_pattern(pc.binary_join_element_wise(cleaned, '.', ''), '.', max_splits=2)
+        code = pc.list_element(parts, 0)
+        suffix = pc.list_element(parts, 1)
+        has_suffix = pc.not_equal(suffix, '')
+
+        # 智能后缀补全
+        first = pc.utf8_slice_codeunits(code, 0, 1)
+        inferred = _first_match(
+            [pc.equal(first, '6'), pc.is_in(first, pa.array(['0', '3'])), pc.equal(first, '8')],
+            ['SH', 'SZ', 'BJ']
+        ).fill_null('')
+        market = pc.if_else(has_suffix, suffix, inferred)
+
+        # 验证代码规则
+        markets = list(self.market_rules)
+        rule_error = _first_match(
+            [pc.and_(pc.equal(market, name), pc.invert(pc.match_substring_regex(code, rule['pattern'])))
+             for name, rule in self.market_rules.items()],
+            [rule['description'] for rule in self.market_rules.values()]
+        )
+
+        # 按 validate_ticker 的检查顺序，排在前面的错误优先
+        errors = _first_match(
+            [
+                pc.equal(cleaned, ''),
+                pc.greater(pc.count_substring(cleaned, '.'), 1),
+                pc.invert(pc.utf8_is_digit(code)),
+                pc.not_equal(pc.utf8_length(code), 6),
+                pc.and_(pc.invert(has_suffix), pc.equal(inferred, '')),
+                pc.and_(has_suffix, pc.invert(pc.is_in(market, pa.array(markets)))),
+                pc.is_valid(rule_error),
+            ],
+            [
+                "输入不能为空",
+                "股票代码格式不正确",
+                "股票代码必须为纯数字",
+                "股票代码必须为6位数字",
+                "无法识别的股票代码开头",
+                pc.binary_join_element_wise("不支持的市场后缀: ", suffix, "，请使用.SH(沪市)或.SZ(深市)", ''),
+                rule_error,
+            ]
+        )
+
+        valid = pc.is_null(errors)
+        standardized = pc.if_else(valid, pc.binary_join_element_wise(code, market, '.'), None)
+        return (valid.to_numpy(zero_copy_only=False),
+                pd.Series(standardized.to_numpy(zero_copy_only=False), index=raw.index, dtype='object'),
+                pd.Series(errors.to_numpy(zero_copy_only=False), index=raw.index, dtype='object'))
+
+    def validate_dates(self, date_strs: ArrayLike, check_trading_day: bool = False) -> Tuple[np.ndarray, pd.Series, pd.Series]:
+        """批量验证日期，规则和错误信息与 validate_date 一致
+
+        返回:
+            tuple: (是否有效的布尔数组, 标准化日期 Series(YYYY-MM-DD), 错误信息 Series)
+        """
+        raw = date_strs if isinstance(date_strs, pd.Series) else pd.Series(list(date_strs), dtype='object')
+        parsed = pd.to_datetime(raw.astype('object'), format='%Y-%m-%d', errors='coerce')
+        standardized = parsed.dt.strftime('%Y-%m-%d')
+        today = pd.Timestamp(datetime.now().date())
+
+        checks = [
+            (parsed.isna().to_numpy(), "日期格式不正确，请使用YYYY-MM-DD格式"),
+            ((parsed > today).to_numpy(), "日期不能是未来日期"),
+            ((parsed.dt.year < 1990).to_numpy(), "日期过早，中国股市始于1990年"),
+        ]
+        if check_trading_day:
+            days = parsed.to_numpy(dtype='datetime64[D]')
+            checks.append((~self.trading_calendar.is_trading_day(days), "该日期不是交易日"))
+        errors = np.select([mask for mask, _ in checks], [message for _, message in checks], default=None)
+
+        valid = errors == None  # noqa: E711
+        return (valid,
+                pd.Series(np.where(valid, standardized.to_numpy(dtype=object), None), index=raw.index, dtype='object'),
+                pd.Series(errors, index=raw.index, dtype='object'))
+
 def china_stock_import():
     """主交互程序"""
     global global_ticker, global_date_std  # 声明使用全局变量
@@ -0,0 +1,121 @@
+import logging
+import os
+import requests
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from data.base_api.http_client import global_http_client
+
+logger = logging.getLogger(__name__)
+
+# 东方财富数据中心接口(可通过环境变量指向本地模拟服务)
+EASTMONEY_API_URL = os.environ.get("EASTMONEY_API_URL", "https://datacenter.eastmoney.com/securities/api/data/get")
+
+
+def build_report_filter(stock_codes: Iterable[str],
+                        report_dates: Optional[Iterable[str]] = None,
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None) -> str:
+    """构建报表接口的 filter 参数
+
+    参数:
+        stock_codes: 股票代码列表(SECUCODE，如 600519.SH)
+        report_dates: 指定的报告期列表(YYYY-MM-DD)，与日期区间二选一
+        start_date: 报告期起始日期(含)
+        end_date: 报告期结束日期(含)
+    """
+    codes = list(stock_codes)
+    if len(codes) == 1:
+        filter_str = f"(SECUCODE=\"{codes[0]}\")"
+    else:
+        filter_str = "(SECUCODE in (" + ",".join(f"\"{code}\"" for code in codes) + "))"
+
+    if report_dates is not None:
+        filter_str += "(REPORT_DATE in ('" + "','".join(report_dates) + "'))"
+    if start_date:
+        filter_str += f"(REPORT_DATE>='{start_date}')"
+    if end_date:
+        filter_str += f"(REPORT_DATE<='{end_date}')"
+    return filter_str
+
+
+def build_report_url(report_type: str, sty: str, filter_str: str, page: int = 1, page_size: int = 5) -> str:
+    """构建报表接口请求URL
+
+    按报告期倒序、同一报告期内按股票代码升序排序: 多只股票同一报告期的行有确定的顺序，
+    分页(p=1..N)时不会漏行或重复
+    """
+    return (
+        f"{EASTMONEY_API_URL}?"
+        f"type={report_type}&"
+        f"sty={sty}&"
+        f"filter={filter_str}&"
+        f"p={page}&ps={page_size}&sr=-1,1&st=REPORT_DATE,SECUCODE&"
+        "source=HSF10&client=PC&v=0538802348949726"
+    )
+
+
+def iter_report_pages(report_type: str, sty: str, filter_str: str, page_size: int = 200,
+                      stats: Optional[dict] = None, start_page: int = 1, refresh: bool = False) -> Iterator[dict]:
+    """按 p/ps 分页逐页获取报表数据
+
+    从 start_page 开始每次产出一页的原始响应，直到最后一页或接口返回空数据；
+    传入 stats 时在 stats['requests'] 中累计实际发出的网络请求数(磁盘响应缓存命中不计)；
+    refresh=True 时跳过磁盘响应缓存，总是请求接口
+    """
+    page = start_page
+    while True:
+        url = build_report_url(report_type, sty, filter_str, page, page_size)
+        response_data = global_http_client.get_json(url, refresh=refresh, stats=stats)
+
+        result = response_data.get('result') or {}
+        if not response_data.get('success') or not result.get('data'):
+            # 接口在无数据时返回 success=False("返回数据为空")
+            return
+
+        yield response_data
+
+        pages = result.get('pages') or 1
+        if page >= pages:
+            return
+        page += 1
+
+
+def fetch_reports_batch(report_type: str, sty: str, stock_codes: Iterable[str],
+                        start_date: Optional[str] = None,
+                        end_date: Optional[str] = None,
+                        report_dates: Optional[List[str]] = None,
+                        chunk_size: int = 50,
+                        page_size: int = 200,
+                        stats: Optional[dict] = None,
+                        refresh: bool = False) -> Dict[str, dict]:
+    """批量获取多只股票的报表数据
+
+    按 chunk_size 将股票代码拆分为 SECUCODE in (...) 请求，并跟随分页取完全部数据；
+    stats / refresh 见 iter_report_pages
+
+    返回:
+        dict: {股票代码: 与单只股票接口相同结构的响应}，可直接交给对应的解析函数；
+              某组请求失败时该组每只股票的响应为 success=False，message 为错误信息(已取到的部分页也丢弃)，
+              调用方据此区分“请求失败”和“没有数据”
+    """
+    codes = list(dict.fromkeys(code.strip().upper() for code in stock_codes))
+    grouped: Dict[str, List[dict]] = {code: [] for code in codes}
+    failed: Dict[str, str] = {}
+
+    for start in range(0, len(codes), chunk_size):
+        chunk = codes[start:start + chunk_size]
+        filter_str = build_report_filter(chunk, report_dates, start_date, end_date)
+        try:
+            for response_data in iter_report_pages(report_type, sty, filter_str, page_size, stats, refresh=refresh):
+                for item in response_data['result']['data']:
+                    grouped.setdefault(item.get('SECUCODE'), []).append(item)
+        except requests.exceptions.RequestException as e:
+            logger.warning("请求失败(%s 等 %d 只股票): %s", chunk[0], len(chunk), e)
+            for code in chunk:
+                failed[code] = f"请求失败: {e}"
+
+    return {
+        code: ({'success': False, 'message': failed[code], 'result': None} if code in failed
+               else {'success': True, 'message': 'ok', 'result': {'data': rows, 'count': len(rows)}})
+        for code, rows in grouped.items()
+    }
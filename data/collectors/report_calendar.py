@@ -0,0 +1,77 @@
+"""财务报告期日历
+
+预先生成 1985 年以来的全部季度末(3-31/6-30/9-30/12-31)，起点早于股市开市(1990)，
+1990 年初的日期往前取若干个报告期也不会超出日历范围；
+日期到报告期的映射通过对有序日期数组二分查找一次完成，支持整列日期批量处理
+"""
+from datetime import date
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+DateLike = Union[str, date, np.datetime64]
+DatesLike = Union[DateLike, Iterable[DateLike], np.ndarray]
+
+
+class ReportCalendar:
+    """季度报告期日历"""
+
+    def __init__(self, start_year: int = 1985, end_year: Optional[int] = None):
+        end_year = end_year or date.today().year + 1
+        years = np.arange(start_year, end_year + 1)
+        # 每个季度末 = 下个季度第一天 - 1天
+        quarter_starts = np.array(['-04-01', '-07-01', '-10-01'])
+        ends = []
+        for year in years:
+            ends.extend(np.datetime64(f"{year}{suffix}") - 1 for suffix in quarter_starts)
+            ends.append(np.datetime64(f"{year}-12-31"))
+        self.report_dates = np.array(ends, dtype='datetime64[D]')
+
+    @staticmethod
+    def _as_days(dates: DatesLike) -> np.ndarray:
+        return np.asarray(dates, dtype='datetime64[D]')
+
+    def _positions(self, days: np.ndarray) -> np.ndarray:
+        """每个日期之前(含当天)最近报告期在 report_dates 中的位置"""
+        positions = np.searchsorted(self.report_dates, days, side='right') - 1
+        if np.any(positions < 0):
+            raise ValueError(f"日期早于报告期日历起点 {self.report_dates[0]}")
+        if np.any(days > self.report_dates[-1] + 92):
+            raise ValueError(f"日期晚于报告期日历终点 {self.report_dates[-1]}")
+        return positions
+
+    def closest(self, dates: DatesLike) -> np.ndarray:
+        """把日期(单个或数组)映射到当天或之前最近的报告期"""
+        return self.report_dates[self._positions(self._as_days(dates))]
+
+    def previous(self, dates: DatesLike, count: int = 4) -> np.ndarray:
+        """每个日期对应的最近报告期及其之前 count 个报告期
+
+        返回:
+            形状为 (..., count + 1) 的数组，每行按时间升序，最后一列为最近报告期
+        """
+        positions = self._positions(self._as_days(dates))
+        window = positions[..., np.newaxis] + np.arange(-count, 1)
+        if np.any(window < 0):
+            raise ValueError(f"往前 {count} 个报告期超出报告期日历起点 {self.report_dates[0]}")
+        return self.report_dates[window]
+
+    def closest_report_date(self, target_date_str: str) -> str:
+        return str(self.closest(target_date_str))
+
+    def previous_report_dates(self, report_date_str: str, count: int = 4) -> List[str]:
+        return [str(day) for day in self.previous(report_date_str, count)]
+
+
+# 全局报告期日历
+report_calendar = ReportCalendar()
+
+
+def find_closest_report_date(target_date_str):
+    """找到目标日期之前(含当天)最近的财务报告期（季度末）"""
+    return report_calendar.closest_report_date(target_date_str)
+
+
+def get_previous_report_dates(report_date_str, count=4):
+    """获取该报告期及之前 count 个报告期（默认前4个季度），按时间顺序排序"""
+    return report_calendar.previous_report_dates(report_date_str, count)
@@ -0,0 +1,312 @@
+"""通用报表采集引擎
+
+每张报表由一个 StatementDescriptor 描述(接口 type/sty、字段 schema、打印摘要)，
+获取、解析、入库、打印和批量采集都由 StatementEngine 按描述符统一完成:
+- 所有报表共用全局 HTTP 客户端(连接池、限流、重试、磁盘响应缓存)和批量/分页逻辑
+- collect_batch 对每组股票一次调度全部报表的批量请求，响应到达后立即解析
+- unified_frame / record 把多张报表按 (股票代码, 报告期) 合并为一条记录
+
+新增报表只需注册一个描述符(本地仓库另需在 STATEMENT_TABLES 中登记数据表)
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+import requests
+
+from data.analysis.ratio_engine import safe_divide
+from data.base_api.http_client import global_http_client
+from data.base_api.instrumentation import PARSE_SECONDS, ROWS_PARSED
+from data.collectors.eastmoney_api import build_report_filter, build_report_url, fetch_reports_batch
+from data.collectors.report_calendar import find_closest_report_date, get_previous_report_dates
+from data.collectors.statement_record import StatementRecord, parse_statement_compact, records_to_frame
+from data.collectors.statement_schema import (BALANCE_SCHEMA, CASHFLOW_SCHEMA, INFO_KEYS, PROFIT_SCHEMA, Schema,
+                                              collect_response_rows)
+from data.collectors.statement_store import StatementStore
+from data.database.datebase import get_warehouse
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ['SECUCODE', 'REPORT_DATE']
+
+# 打印摘要中的一项: (显示名, (分组, 科目名) 或根据记录计算数值的函数, 格式)
+# 格式: amount 千分位金额，ratio 小数显示为百分比，percent 数值本身即为百分数
+Highlight = Tuple[str, Union[Tuple[str, str], Callable[[StatementRecord], float]], str]
+
+_FORMATS = {
+    'amount': lambda value: f"{value:,.2f}",
+    'ratio': lambda value: f"{value:.2%}",
+    'percent': lambda value: f"{value or 0:.2f}%",
+}
+
+
+class StatementDescriptor:
+    """一张报表的描述
+
+    参数:
+        name: 报表类型(balance/profit/cashflow)，也是本地仓库和导出目录使用的名称
+        title: 中文名称
+        report_type, sty: 东方财富报表接口的 type/sty 参数
+        schema: 字段定义，见 statement_schema
+        highlights: 打印摘要 [(分组标题, [Highlight, ...]), ...]
+    """
+
+    def __init__(self, name: str, title: str, report_type: str, sty: str, schema: Schema,
+                 highlights: Optional[List[Tuple[str, List[Highlight]]]] = None):
+        self.name = name
+        self.title = title
+        self.report_type = report_type
+        self.sty = sty
+        self.schema = schema
+        self.highlights = highlights or []
+        # 全局报表仓库: (股票代码, 报告期) -> StatementRecord
+        self.store: StatementStore[StatementRecord] = StatementStore()
+
+    def __repr__(self):
+        return f"StatementDescriptor({self.name}, {self.report_type})"
+
+
+BALANCE_STATEMENT = StatementDescriptor(
+    'balance', '资产负债表', 'RPT_F10_FINANCE_GBALANCE', 'F10_FINANCE_GBALANCE', BALANCE_SCHEMA,
+    highlights=[
+        ('资产负债表', [
+            ('总资产', ('资产负债表', '总资产(元)'), 'amount'),
+            ('总负债', ('资产负债表', '总负债(元)'), 'amount'),
+            ('股东权益', ('资产负债表', '股东权益合计(元)'), 'amount'),
+            ('资产负债率', lambda record: safe_divide(record['TOTAL_LIABILITIES'], record['TOTAL_ASSETS']), 'ratio'),
+        ]),
+        ('关键科目', [
+            ('货币资金', ('关键科目', '货币资金(元)'), 'amount'),
+            ('存货', ('关键科目', '存货(元)'), 'amount'),
+            ('合同负债', ('关键科目', '合同负债(元)'), 'amount'),
+        ]),
+        ('同比增长', [
+            ('总资产增长', ('同比增长', '总资产增长率(%)'), 'percent'),
+            ('股东权益增长', ('同比增长', '股东权益增长率(%)'), 'percent'),
+        ]),
+    ],
+)
+
+PROFIT_STATEMENT = StatementDescriptor(
+    'profit', '利润表', 'RPT_F10_FINANCE_GINCOMEQC', 'PC_F10_GINCOMEQC', PROFIT_SCHEMA,
+    highlights=[
+        ('关键财务指标', [
+            ('营业收入', ('利润表', '营业收入'), 'amount'),
+            ('营业利润', ('利润表', '营业利润'), 'amount'),
+            ('净利润', ('利润表', '净利润'), 'amount'),
+            ('归属于母公司股东的净利润', ('利润表', '归属于母公司股东的净利润'), 'amount'),
+        ]),
+    ],
+)
+
+CASHFLOW_STATEMENT = StatementDescriptor(
+    'cashflow', '现金流量表', 'RPT_F10_FINANCE_GCASHFLOWQC', 'PC_F10_GCASHFLOWQC', CASHFLOW_SCHEMA,
+    highlights=[
+        ('现金流量净额', [
+            ('经营活动', ('经营活动', '经营活动产生的现金流量净额'), 'amount'),
+            ('投资活动', ('投资活动', '投资活动产生的现金流量净额'), 'amount'),
+            ('筹资活动', ('筹资活动', '筹资活动产生的现金流量净额'), 'amount'),
+            ('现金及现金等价物净增加额', ('现金及现金等价物', '现金及现金等价物净增加额'), 'amount'),
+        ]),
+    ],
+)
+
+
+class StatementEngine:
+    """按描述符驱动的报表采集、解析与合并"""
+
+    def __init__(self, descriptors: Iterable[StatementDescriptor] = ()):
+        self.statements: Dict[str, StatementDescriptor] = {}
+        for descriptor in descriptors:
+            self.register(descriptor)
+
+    def register(self, descriptor: StatementDescriptor) -> StatementDescriptor:
+        self.statements[descriptor.name] = descriptor
+        return descriptor
+
+    def descriptor(self, statement: str) -> StatementDescriptor:
+        try:
+            return self.statements[statement]
+        except KeyError:
+            raise ValueError(f"未知的报表类型: {statement}")
+
+    def names(self) -> List[str]:
+        return list(self.statements)
+
+    def fetch(self, statement: str, stock_code: str, target_date_str: str, history: int = 4) -> Optional[dict]:
+        """获取单只股票目标日期最近报告期及之前 history 个报告期的数据
+
+        全部报告期都已在本地仓库中时不请求网络；日期超出报告期日历或请求失败时返回 None
+        """
+        descriptor = self.descriptor(statement)
+        try:
+            report_dates = get_previous_report_dates(find_closest_report_date(target_date_str), history)
+        except ValueError as e:
+            logger.warning("%s %s 日期无效: %s", stock_code, descriptor.title, e)
+            return None
+
+        warehouse = get_warehouse()
+        if warehouse is not None:
+            stored = warehouse.get_response(statement, stock_code, report_dates)
+            if stored is not None:
+                return stored
+
+        url = build_report_url(descriptor.report_type, descriptor.sty,
+                               build_report_filter([stock_code], report_dates),
+                               page=1, page_size=len(report_dates))
+        try:
+            return global_http_client.get_json(url)
+        except requests.exceptions.RequestException as e:
+            logger.warning("%s %s 请求失败: %s", stock_code, descriptor.title, e)
+            return None
+
+    def fetch_batch(self, statement: str, stock_codes: Iterable[str], start_date: Optional[str] = None,
+                    end_date: Optional[str] = None, report_dates: Optional[List[str]] = None,
+                    chunk_size: int = 50, page_size: int = 200, stats: Optional[dict] = None,
+                    refresh: bool = False) -> Dict[str, dict]:
+        """批量获取多只股票的报表数据，返回 {股票代码: 响应}，见 fetch_reports_batch"""
+        descriptor = self.descriptor(statement)
+        return fetch_reports_batch(descriptor.report_type, descriptor.sty, stock_codes,
+                                   start_date=start_date, end_date=end_date, report_dates=report_dates,
+                                   chunk_size=chunk_size, page_size=page_size, stats=stats, refresh=refresh)
+
+    def parse(self, statement: str, responses: Union[dict, Iterable[dict]], keep_in_memory: bool = True) -> int:
+        """解析一个或一批响应，按 (股票代码, 报告期) 写入内存仓库和本地数据库，返回解析的行数
+
+        keep_in_memory=False 时只写入本地数据库，不在内存仓库中保留记录(用于大范围历史回补)
+        """
+        descriptor = self.descriptor(statement)
+        if isinstance(responses, dict) and not responses.get('success'):
+            logger.warning("%s API请求失败: %s", descriptor.title, responses.get('message'))
+            return 0
+
+        data_list = collect_response_rows(responses)
+        with PARSE_SECONDS.time(statement=statement):
+            parsed = parse_statement_compact({'success': True, 'result': {'data': data_list}}, descriptor.schema)
+        ROWS_PARSED.inc(len(parsed), statement=statement)
+        if keep_in_memory:
+            descriptor.store.put_many((record.info[0], report_date, record) for report_date, record in parsed)
+
+        # 写入本地仓库(数据本身来自仓库时无需重复写入)
+        warehouse = get_warehouse()
+        from_warehouse = isinstance(responses, dict) and responses.get('source') == 'warehouse'
+        if warehouse is not None and not from_warehouse:
+            warehouse.upsert_rows(statement, [(item, record.to_dict()) for item, (_, record) in zip(data_list, parsed)])
+        return len(parsed)
+
+    def collect_batch(self, stock_codes: Iterable[str], start_date: Optional[str] = None,
+                      end_date: Optional[str] = None, report_dates: Optional[List[str]] = None,
+                      statements: Optional[Iterable[str]] = None, chunk_size: int = 50,
+                      workers: Optional[int] = None,
+                      on_chunk: Optional[Callable[[str, Dict[str, dict]], None]] = None) -> Dict[str, int]:
+        """一次调度采集多张报表
+
+        股票按 chunk_size 分组，每组的全部报表请求同时提交到线程池(共用全局客户端的连接池和限流)，
+        每个批量响应到达后立即解析入库；on_chunk(报表类型, {股票代码: 响应}) 在每组解析后调用
+
+        返回:
+            dict: {报表类型: 解析的行数}
+        """
+        statements = list(statements) if statements is not None else self.names()
+        for statement in statements:
+            self.descriptor(statement)
+        codes = list(dict.fromkeys(code.strip().upper() for code in stock_codes))
+        chunks = [codes[i:i + chunk_size] for i in range(0, len(codes), chunk_size)]
+
+        summary = {statement: 0 for statement in statements}
+        with ThreadPoolExecutor(max_workers=workers or len(statements)) as executor:
+            futures = {
+                executor.submit(self.fetch_batch, statement, chunk, start_date, end_date, report_dates,
+                                len(chunk)): statement
+                for chunk in chunks
+                for statement in statements
+            }
+            for future in as_completed(futures):
+                statement = futures[future]
+                responses = future.result()
+                summary[statement] += self.parse(statement, responses.values())
+                if on_chunk is not None:
+                    on_chunk(statement, responses)
+        return summary
+
+    def record(self, stock_code: str, report_date: str,
+               statements: Optional[Iterable[str]] = None) -> Dict[str, StatementRecord]:
+        """某只股票某个报告期的合并记录: {报表类型: StatementRecord}，缺失的报表不出现"""
+        statements = list(statements) if statements is not None else self.names()
+        records = {}
+        for statement in statements:
+            record = self.descriptor(statement).store.get(stock_code, report_date)
+            if record is not None:
+                records[statement] = record
+        return records
+
+    def unified_frame(self, stock_codes: Optional[Iterable[str]] = None,
+                      statements: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """把多张报表按 (股票代码, 报告期) 外连接为一张宽表
+
+        基本信息取自第一张有数据的报表；不同报表中同名的接口字段加上报表类型后缀(如
+        OTHER_COMPRE_INCOME_balance)，其余字段保持接口字段名；缺失的报表字段为 NaN
+        """
+        statements = list(statements) if statements is not None else self.names()
+        codes = list(stock_codes) if stock_codes is not None else None
+
+        frames = {}
+        for statement in statements:
+            descriptor = self.descriptor(statement)
+            if codes is None:
+                items = descriptor.store.items()
+            else:
+                items = [(code, report_date, record) for code in codes
+                         for report_date, record in sorted(descriptor.store.periods_of(code).items())]
+            frames[statement] = records_to_frame(items, descriptor.schema).set_index(KEY_COLUMNS)
+
+        info_columns = [key for key in INFO_KEYS if key != 'SECUCODE']
+        counts: Dict[str, int] = {}
+        for frame in frames.values():
+            for column in frame.columns.difference(info_columns):
+                counts[column] = counts.get(column, 0) + 1
+
+        info = None
+        parts = []
+        for statement, frame in frames.items():
+            info = frame[info_columns] if info is None else info.combine_first(frame[info_columns])
+            values = frame.drop(columns=info_columns)
+            parts.append(values.rename(columns={column: f"{column}_{statement}"
+                                                for column in values.columns if counts[column] > 1}))
+
+        if info is None:
+            return pd.DataFrame(columns=KEY_COLUMNS).set_index(KEY_COLUMNS)
+        return pd.concat([info] + parts, axis=1).sort_index()
+
+    def print_statement(self, statement: str, stock_code: Optional[str] = None):
+        """打印内存仓库中的报表摘要
+
+        参数:
+            stock_code: 只打印该股票，默认打印全部股票
+        """
+        descriptor = self.descriptor(statement)
+        store = descriptor.store
+        stock_codes = [stock_code] if stock_code else store.stock_codes()
+        if not any(store.periods_of(code) for code in stock_codes):
+            print(f"没有可用的{descriptor.title}数据")
+            return
+
+        for code in stock_codes:
+            periods = store.periods_of(code)
+            # 按报告日期倒序
+            for date in sorted(periods, reverse=True):
+                record = periods[date]
+                info = record['基本信息']
+                print(f"\n=== {date} {info['报告类型']} {descriptor.title} ===")
+                print(f"股票: {info['股票名称']}({info['股票代码']})")
+                print(f"公告日期: {info['公告日期']}")
+                for heading, items in descriptor.highlights:
+                    print(f"\n【{heading}】")
+                    for label, source, fmt in items:
+                        value = source(record) if callable(source) else record.value(*source)
+                        print(f"{label}: {_FORMATS[fmt](value)}")
+
+
+# 全局报表引擎: 资产负债表、利润表(单季)、现金流量表(单季)
+statement_engine = StatementEngine([BALANCE_STATEMENT, PROFIT_STATEMENT, CASHFLOW_STATEMENT])
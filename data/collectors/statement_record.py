@@ -0,0 +1,154 @@
+"""紧凑的单期报表记录
+
+每条记录只保存一行 float64 数值(按接口字段连续存放)和少量基本信息，
+中文科目名到字段位置的映射由同一张报表的所有记录共享
+"""
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from data.collectors.statement_schema import INFO_FIELDS, Schema, collect_response_rows, field_keys, schema_keys
+
+INFO_LABELS = [label for label, _ in INFO_FIELDS]
+
+
+class FieldLayout:
+    """一张报表的共享字段索引"""
+
+    _layouts: Dict[int, 'FieldLayout'] = {}
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.keys = schema_keys(schema)
+        self.position = {key: i for i, key in enumerate(self.keys)}
+
+        # 分组 -> [(科目名, 字段位置元组)]
+        self.sections: Dict[str, List[Tuple[str, Tuple[int, ...]]]] = {
+            section: [(label, tuple(self.position[key] for key in field_keys(field))) for label, field in fields]
+            for section, fields in schema.items()
+        }
+
+        # 科目名 -> 字段位置；同名科目对应不同字段时记为 None(需指定分组)
+        self.labels: Dict[str, Optional[Tuple[int, ...]]] = {}
+        for fields in self.sections.values():
+            for label, idx in fields:
+                if label in self.labels and self.labels[label] != idx:
+                    self.labels[label] = None
+                else:
+                    self.labels[label] = idx
+
+    @classmethod
+    def for_schema(cls, schema: Schema) -> 'FieldLayout':
+        layout = cls._layouts.get(id(schema))
+        if layout is None:
+            layout = cls._layouts[id(schema)] = cls(schema)
+        return layout
+
+
+def _sum(values: np.ndarray, idx: Tuple[int, ...]) -> float:
+    if len(idx) == 1:
+        return float(values[idx[0]])
+    return float(sum(values[i] for i in idx))
+
+
+class StatementRecord:
+    """单只股票单个报告期的报表记录
+
+    支持三种查找方式:
+        record['资产']              -> 该分组的 {科目名: 数值}
+        record['货币资金']          -> 科目数值(同名科目出现在多个分组时需用 value(分组, 科目))
+        record['MONETARYFUNDS']     -> 接口字段数值
+    """
+
+    __slots__ = ('layout', 'info', 'values')
+
+    def __init__(self, layout: FieldLayout, info: Tuple, values: np.ndarray):
+        self.layout = layout
+        self.info = info
+        self.values = values
+
+    def __getitem__(self, key: str):
+        if key == '基本信息':
+            return dict(zip(INFO_LABELS, self.info))
+        layout = self.layout
+        if key in layout.sections:
+            return {label: _sum(self.values, idx) for label, idx in layout.sections[key]}
+        if key in layout.labels:
+            idx = layout.labels[key]
+            if idx is None:
+                raise KeyError(f"科目 {key} 出现在多个分组中，请使用 value(分组, 科目)")
+            return _sum(self.values, idx)
+        if key in layout.position:
+            return float(self.values[layout.position[key]])
+        if key in INFO_LABELS:
+            return self.info[INFO_LABELS.index(key)]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def value(self, section: str, label: str) -> float:
+        """按 分组 + 科目名 取值"""
+        for field_label, idx in self.layout.sections[section]:
+            if field_label == label:
+                return _sum(self.values, idx)
+        raise KeyError(f"{section}/{label}")
+
+    def keys(self):
+        return ['基本信息'] + list(self.layout.sections)
+
+    def to_dict(self) -> dict:
+        """导出为原有的嵌套字典结构"""
+        return {section: self[section] for section in self.keys()}
+
+    @property
+    def nbytes(self) -> int:
+        """数值部分占用的字节数"""
+        return self.values.nbytes
+
+    def __repr__(self):
+        return f"StatementRecord({self.info[0]}, {self.info[1]}, {self.info[2]})"
+
+
+def _intern(value):
+    """股票代码/名称等在大量记录中重复出现，驻留后只保留一份字符串"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def parse_statement_compact(responses: Union[dict, Iterable[dict]], schema: Schema) -> List[Tuple[str, StatementRecord]]:
+    """把接口响应解析为 [(报告期, StatementRecord), ...]
+
+    同一批响应的数值存放在一个连续的二维矩阵中，每条记录持有其中一行的视图
+    """
+    layout = FieldLayout.for_schema(schema)
+    rows = collect_response_rows(responses)
+
+    matrix = np.array([list(map(item.get, layout.keys)) for item in rows], dtype='float64')
+    matrix = matrix.reshape(len(rows), len(layout.keys))
+    np.nan_to_num(matrix, copy=False, nan=0.0, posinf=np.inf, neginf=-np.inf)
+
+    records = []
+    for item, values in zip(rows, matrix):
+        info = tuple(_intern(item.get(key)) for _, key in INFO_FIELDS[:-1])
+        info += (_intern((item.get('NOTICE_DATE') or '').split(' ')[0]),)
+        report_date = _intern((item.get('REPORT_DATE') or '').split(' ')[0])
+        records.append((report_date, StatementRecord(layout, info, values)))
+    return records
+
+
+def records_to_frame(items: Iterable[Tuple[str, str, StatementRecord]], schema: Schema) -> pd.DataFrame:
+    """把 [(股票代码, 报告期, StatementRecord), ...] 还原为 parse_statement_frame 同样列结构的 DataFrame"""
+    layout = FieldLayout.for_schema(schema)
+    items = list(items)
+    values = np.vstack([record.values for _, _, record in items]) if items else np.empty((0, len(layout.keys)))
+    info = pd.DataFrame(
+        [(report_date,) + record.info for _, report_date, record in items],
+        columns=['REPORT_DATE'] + [key for _, key in INFO_FIELDS],
+        dtype='object'
+    )
+    return pd.concat([info, pd.DataFrame(values, columns=layout.keys)], axis=1)
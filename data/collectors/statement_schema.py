@@ -0,0 +1,435 @@
+"""报表字段映射: 中文科目名 <-> 东方财富接口字段
+
+每张报表的 schema 为 {分组: [(中文科目名, 接口字段), ...]}，
+接口字段为元组时表示多个字段之和
+"""
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+FieldKeys = Union[str, Tuple[str, ...]]
+Schema = Dict[str, List[Tuple[str, FieldKeys]]]
+
+# 基本信息(字符串字段)
+INFO_FIELDS: List[Tuple[str, str]] = [
+    ('股票代码', 'SECUCODE'),
+    ('股票名称', 'SECURITY_NAME_ABBR'),
+    ('报告类型', 'REPORT_TYPE'),
+    ('货币单位', 'CURRENCY'),
+    ('公告日期', 'NOTICE_DATE'),
+]
+INFO_KEYS = [key for _, key in INFO_FIELDS]
+
+# 需要截取为 YYYY-MM-DD 的日期字段
+DATE_KEYS = ['REPORT_DATE', 'NOTICE_DATE']
+
+# 资产负债表(RPT_F10_FINANCE_GBALANCE)
+BALANCE_SCHEMA: Schema = {
+    '资产负债表': [
+        ('流动资产合计(元)', 'TOTAL_CURRENT_ASSETS'),
+        ('非流动资产合计(元)', 'TOTAL_NONCURRENT_ASSETS'),
+        ('总资产(元)', 'TOTAL_ASSETS'),
+        ('流动负债合计(元)', 'TOTAL_CURRENT_LIAB'),
+        ('非流动负债合计(元)', 'TOTAL_NONCURRENT_LIAB'),
+        ('总负债(元)', 'TOTAL_LIABILITIES'),
+        ('股东权益合计(元)', 'TOTAL_EQUITY'),
+    ],
+    '资产': [
+        ('货币资金', 'MONETARYFUNDS'),
+        ('结算备付金', 'SETTLE_EXCESS_RESERVE'),
+        ('拆出资金', 'LEND_FUND'),
+        ('交易性金融资产', 'TRADE_FINASSET_NOTFVTPL'),
+        ('融出资金', 'FIN_FUND'),
+        ('以公允价值计量且其变动计入当期损益的金融资产', 'FVTPL_FINASSET'),
+        ('指定以公允价值计量且其变动计入当期损益的金融资产', 'APPOINT_FVTPL_FINASSET'),
+        ('衍生金融资产', 'DERIVE_FINASSET'),
+        ('应收票据及应收账款', 'NOTE_ACCOUNTS_RECE'),
+        ('应收票据', 'NOTE_RECE'),
+        ('应收账款', 'ACCOUNTS_RECE'),
+        ('应收款项融资', 'FINANCE_RECE'),
+        ('预付款项', 'PREPAYMENT'),
+        ('应收保费', 'PREMIUM_RECE'),
+        ('应收分保账款', 'REINSURE_RECE'),
+        ('应收分保合同准备金', 'RC_RESERVE_RECE'),
+        ('其他应收款合计', 'TOTAL_OTHER_RECE'),
+        ('应收利息', 'INTEREST_RECE'),
+        ('应收股利', 'DIVIDEND_RECE'),
+        ('其他应收款', 'OTHER_RECE'),
+        ('应收出口退税', 'EXPORT_REFUND_RECE'),
+        ('应收补贴款', 'SUBSIDY_RECE'),
+        ('内部应收款', 'INTERNAL_RECE'),
+        ('买入返售金融资产', 'BUY_RESALE_FINASSET'),
+        ('以摊余成本计量的金融资产', 'AMORTIZE_COST_FINASSET'),
+        ('以公允价值计量且其变动计入其他综合收益的金融资产', 'FVTOCI_FINASSET'),
+        ('存货', 'INVENTORY'),
+        ('合同资产', 'CONTRACT_ASSET'),
+        ('持有待售资产', 'HOLDSALE_ASSET'),
+        ('一年内到期的非流动资产', 'NONCURRENT_ASSET_1YEAR'),
+        ('其他流动资产', 'OTHER_CURRENT_ASSET'),
+        ('流动资产其他项目', 'CURRENT_ASSET_OTHER'),
+        ('流动资产合计', 'TOTAL_CURRENT_ASSETS'),
+        ('发放贷款及垫款', 'LOAN_ADVANCE'),
+        ('债权投资', 'CREDITOR_INVEST'),
+        ('以摊余成本计量的金融资产（非流动）', 'AMORTIZE_COST_NCFINASSET'),
+        ('其他债权投资', 'OTHER_CREDITOR_INVEST'),
+        ('以公允价值计量且其变动计入其他综合收益的金融资产（非流动）', 'FVTOCI_NCFINASSET'),
+        ('可供出售金融资产', 'AVAILABLE_SALE_FINASSET'),
+        ('持有至到期投资', 'HOLD_MATURITY_INVEST'),
+        ('长期应收款', 'LONG_RECE'),
+        ('长期股权投资', 'LONG_EQUITY_INVEST'),
+        ('其他权益工具投资', 'OTHER_EQUITY_INVEST'),
+        ('其他非流动金融资产', 'OTHER_NONCURRENT_FINASSET'),
+        ('投资性房地产', 'INVEST_REALESTATE'),
+        ('固定资产', 'FIXED_ASSET'),
+        ('在建工程', 'CIP'),
+        ('使用权资产', 'USERIGHT_ASSET'),
+        ('工程物资', 'PROJECT_MATERIAL'),
+        ('固定资产清理', 'FIXED_ASSET_DISPOSAL'),
+        ('生产性生物资产', 'PRODUCTIVE_BIOLOGY_ASSET'),
+        ('油气资产', 'OIL_GAS_ASSET'),
+        ('无形资产', 'INTANGIBLE_ASSET'),
+        ('开发支出', 'DEVELOP_EXPENSE'),
+        ('商誉', 'GOODWILL'),
+        ('长期待摊费用', 'LONG_PREPAID_EXPENSE'),
+        ('递延所得税资产', 'DEFER_TAX_ASSET'),
+        ('其他非流动资产', 'OTHER_NONCURRENT_ASSET'),
+        ('非流动资产其他项目', 'NONCURRENT_ASSET_OTHER'),
+        ('非流动资产平衡项目', 'NONCURRENT_ASSET_BALANCE'),
+        ('非流动资产合计', 'TOTAL_NONCURRENT_ASSETS'),
+        ('资产其他项目', 'ASSET_OTHER'),
+        ('资产总计', 'TOTAL_ASSETS'),
+    ],
+    '负债': [
+        ('短期借款', 'SHORT_LOAN'),
+        ('向中央银行借款', 'LOAN_PBC'),
+        ('吸收存款及同业存放', 'ACCEPT_DEPOSIT_INTERBANK'),
+        ('拆入资金', 'BORROW_FUND'),
+        ('交易性金融负债', 'TRADE_FINLIAB_NOTFVTPL'),
+        ('以公允价值计量且其变动计入当期损益的金融负债', 'FVTPL_FINLIAB'),
+        ('指定以公允价值计量且其变动计入当期损益的金融负债', 'APPOINT_FVTPL_FINLIAB'),
+        ('衍生金融负债', 'DERIVE_FINLIAB'),
+        ('应付票据及应付账款', 'NOTE_ACCOUNTS_PAYABLE'),
+        ('应付票据', 'NOTE_PAYABLE'),
+        ('应付账款', 'ACCOUNTS_PAYABLE'),
+        ('预收款项', 'ADVANCE_RECEIVABLES'),
+        ('合同负债', 'CONTRACT_LIAB'),
+        ('卖出回购金融资产款', 'SELL_REPO_FINASSET'),
+        ('应付手续费及佣金', 'FEE_COMMISSION_PAYABLE'),
+        ('应付职工薪酬', 'STAFF_SALARY_PAYABLE'),
+        ('应交税费', 'TAX_PAYABLE'),
+        ('其他应付款合计', 'TOTAL_OTHER_PAYABLE'),
+        ('应付利息', 'INTEREST_PAYABLE'),
+        ('应付股利', 'DIVIDEND_PAYABLE'),
+        ('其他应付款', 'OTHER_PAYABLE'),
+        ('应付分保账款', 'REINSURE_PAYABLE'),
+        ('内部应付款', 'INTERNAL_PAYABLE'),
+        ('预计流动负债', 'PREDICT_CURRENT_LIAB'),
+        ('保险合同准备金', 'INSURANCE_CONTRACT_RESERVE'),
+        ('代理买卖证券款', 'AGENT_TRADE_SECURITY'),
+        ('代理承销证券款', 'AGENT_UNDERWRITE_SECURITY'),
+        ('以摊余成本计量的金融负债', 'AMORTIZE_COST_FINLIAB'),
+        ('应付短期债券', 'SHORT_BOND_PAYABLE'),
+        ('持有待售负债', 'HOLDSALE_LIAB'),
+        ('一年内到期的非流动负债', 'NONCURRENT_LIAB_1YEAR'),
+        ('其他流动负债', 'OTHER_CURRENT_LIAB'),
+        ('流动负债其他项目', 'CURRENT_LIAB_OTHER'),
+        ('流动负债平衡项目', 'CURRENT_LIAB_BALANCE'),
+        ('流动负债合计', 'TOTAL_CURRENT_LIAB'),
+        ('长期借款', 'LONG_LOAN'),
+        ('以摊余成本计量的金融负债（非流动）', 'AMORTIZE_COST_NCFINLIAB'),
+        ('应付债券', 'BOND_PAYABLE'),
+        ('永续债', 'PERPETUAL_BOND_PAYBALE'),
+        ('租赁负债', 'LEASE_LIAB'),
+        ('长期应付款', 'LONG_PAYABLE'),
+        ('长期应付职工薪酬', 'LONG_STAFFSALARY_PAYABLE'),
+        ('专项应付款', 'SPECIAL_PAYABLE'),
+        ('预计负债', 'PREDICT_LIAB'),
+        ('递延收益', 'DEFER_INCOME'),
+        ('递延所得税负债', 'DEFER_TAX_LIAB'),
+        ('其他非流动负债', 'OTHER_NONCURRENT_LIAB'),
+        ('非流动负债其他项目', 'NONCURRENT_LIAB_OTHER'),
+        ('非流动负债平衡项目', 'NONCURRENT_LIAB_BALANCE'),
+        ('非流动负债合计', 'TOTAL_NONCURRENT_LIAB'),
+        ('负债其他项目', 'LIAB_OTHER'),
+        ('负债平衡项目', 'LIAB_BALANCE'),
+        ('负债合计', 'TOTAL_LIABILITIES'),
+    ],
+    '股东权益': [
+        ('实收资本（或股本）', 'SHARE_CAPITAL'),
+        ('其他权益工具', ('OTHER_EQUITY_TOOL', 'OTHER_EQUITY_OTHER')),
+        ('优先股', 'PREFERRED_SHARES'),
+        ('永续债', 'PERPETUAL_BOND'),
+        ('资本公积', 'CAPITAL_RESERVE'),
+        ('减:库存股', 'TREASURY_SHARES'),
+        ('其他综合收益', 'OTHER_COMPRE_INCOME'),
+        ('专项储备', 'SPECIAL_RESERVE'),
+        ('盈余公积', 'SURPLUS_RESERVE'),
+        ('一般风险准备', 'GENERAL_RISK_RESERVE'),
+        ('未确定的投资损失', 'UNCONFIRM_INVEST_LOSS'),
+        ('未分配利润', 'UNASSIGN_RPOFIT'),
+        ('拟分配现金股利', 'ASSIGN_CASH_DIVIDEND'),
+        ('外币报表折算差额', 'CONVERT_DIFF'),
+        ('归属于母公司股东权益其他项目', 'PARENT_EQUITY_OTHER'),
+        ('归属于母公司股东权益平衡项目', 'PARENT_EQUITY_BALANCE'),
+        ('归属于母公司股东权益总计', 'TOTAL_PARENT_EQUITY'),
+        ('少数股东权益', 'MINORITY_EQUITY'),
+        ('股东权益其他项目', 'EQUITY_OTHER'),
+        ('股东权益平衡项目', 'EQUITY_BALANCE'),
+        ('股东权益合计', 'TOTAL_EQUITY'),
+        ('负债和股东权益其他项目', 'LIAB_EQUITY_OTHER'),
+        ('负债及股东权益平衡项目', 'LIAB_EQUITY_BALANCE'),
+        ('负债和股东权益总计', 'TOTAL_LIAB_EQUITY'),
+    ],
+    '关键科目': [
+        ('货币资金(元)', 'MONETARYFUNDS'),
+        ('应收账款(元)', 'ACCOUNTS_RECE'),
+        ('存货(元)', 'INVENTORY'),
+        ('固定资产(元)', 'FIXED_ASSET'),
+        ('无形资产(元)', 'INTANGIBLE_ASSET'),
+        ('应付账款(元)', 'ACCOUNTS_PAYABLE'),
+        ('合同负债(元)', 'CONTRACT_LIAB'),
+        ('应交税费(元)', 'TAX_PAYABLE'),
+    ],
+    '同比增长': [
+        ('总资产增长率(%)', 'TOTAL_ASSETS_YOY'),
+        ('股东权益增长率(%)', 'TOTAL_EQUITY_YOY'),
+        ('存货增长率(%)', 'INVENTORY_YOY'),
+        ('合同负债增长率(%)', 'CONTRACT_LIAB_YOY'),
+    ],
+}
+
+
+# 单季度利润表(RPT_F10_FINANCE_GINCOMEQC)
+PROFIT_SCHEMA: Schema = {
+    '利润表': [
+        ('营业总收入', 'TOTAL_OPERATE_INCOME'),
+        ('营业收入', 'OPERATE_INCOME'),
+        ('利息收入', 'INTEREST_INCOME'),
+        ('已赚保费', 'EARNED_PREMIUM'),
+        ('手续费及佣金收入', 'FEE_COMMISSION_INCOME'),
+        ('其他业务收入', 'OTHER_BUSINESS_INCOME'),
+        ('营业总收入其他项目', 'TOI_OTHER'),
+        ('营业总成本', 'TOTAL_OPERATE_COST'),
+        ('营业成本', 'OPERATE_COST'),
+        ('利息支出', 'INTEREST_EXPENSE'),
+        ('手续费及佣金支出', 'FEE_COMMISSION_EXPENSE'),
+        ('研发费用', 'RESEARCH_EXPENSE'),
+        ('退保金', 'SURRENDER_VALUE'),
+        ('赔付支出净额', 'NET_COMPENSATE_EXPENSE'),
+        ('提取保险合同准备金净额', 'NET_CONTRACT_RESERVE'),
+        ('保单红利支出', 'POLICY_BONUS_EXPENSE'),
+        ('分保费用', 'REINSURE_EXPENSE'),
+        ('其他业务成本', 'OTHER_BUSINESS_COST'),
+        ('营业税金及附加', 'OPERATE_TAX_ADD'),
+        ('销售费用', 'SALE_EXPENSE'),
+        ('管理费用', 'MANAGE_EXPENSE'),
+        ('财务费用', 'FINANCE_EXPENSE'),
+        ('利息费用', 'FE_INTEREST_EXPENSE'),
+        ('利息收入(财务费用)', 'FE_INTEREST_INCOME'),  # 重命名避免重复
+        ('资产减值损失', 'ASSET_IMPAIRMENT_LOSS'),
+        ('信用减值损失', 'CREDIT_IMPAIRMENT_LOSS'),
+        ('营业总成本其他项目', 'TOC_OTHER'),
+        ('公允价值变动收益', 'FAIRVALUE_CHANGE_INCOME'),
+        ('投资收益', 'INVEST_INCOME'),
+        ('对联营企业和合营企业的投资收益', 'INVEST_JOINT_INCOME'),
+        ('净敞口套期收益', 'NET_EXPOSURE_INCOME'),
+        ('汇兑收益', 'EXCHANGE_INCOME'),
+        ('资产处置收益', 'ASSET_DISPOSAL_INCOME'),
+        ('其他收益', 'OTHER_INCOME'),
+        ('营业利润其他项目', 'OPERATE_PROFIT_OTHER'),
+        ('营业利润平衡项目', 'OPERATE_PROFIT_BALANCE'),
+        ('营业利润', 'OPERATE_PROFIT'),
+        ('营业外收入', 'NONBUSINESS_INCOME'),
+        ('非流动资产处置利得', 'NONCURRENT_DISPOSAL_INCOME'),
+        ('营业外支出', 'NONBUSINESS_EXPENSE'),
+        ('非流动资产处置净损失', 'NONCURRENT_DISPOSAL_LOSS'),
+        ('影响利润总额的其他项目', 'EFFECT_TP_OTHER'),
+        ('利润总额平衡项目', 'TOTAL_PROFIT_BALANCE'),
+        ('利润总额', 'TOTAL_PROFIT'),
+        ('所得税', 'INCOME_TAX'),
+        ('影响净利润的其他项目', 'EFFECT_NETPROFIT_OTHER'),
+        ('未确认投资损失', 'UNCONFIRM_INVEST_LOSS'),
+        ('净利润', 'NETPROFIT'),
+        ('被合并方在合并前实现利润', 'PRECOMBINE_PROFIT'),
+        ('持续经营净利润', 'CONTINUED_NETPROFIT'),
+        ('终止经营净利润', 'DISCONTINUED_NETPROFIT'),
+        ('归属于母公司股东的净利润', 'PARENT_NETPROFIT'),
+        ('少数股东损益', 'MINORITY_INTEREST'),
+        ('扣除非经常性损益后的净利润', 'DEDUCT_PARENT_NETPROFIT'),
+        ('净利润其他项目', 'NETPROFIT_OTHER'),
+        ('基本每股收益', 'BASIC_EPS'),
+        ('稀释每股收益', 'DILUTED_EPS'),
+        ('其他综合收益', 'OTHER_COMPRE_INCOME'),
+        ('归属于母公司股东的其他综合收益', 'PARENT_OCI'),
+        ('归属于少数股东的其他综合收益', 'MINORITY_OCI'),
+        ('综合收益总额', 'TOTAL_COMPRE_INCOME'),
+        ('归属于母公司股东的综合收益总额', 'PARENT_TCI'),
+        ('归属于少数股东的综合收益总额', 'MINORITY_TCI'),
+    ],
+}
+
+
+
+# 单季度现金流量表(RPT_F10_FINANCE_GCASHFLOWQC)
+CASHFLOW_SCHEMA: Schema = {
+    '经营活动': [
+        ('销售商品、提供劳务收到的现金', 'SALES_SERVICES'),
+        ('客户存款和同业存放款项净增加额', 'DEPOSIT_INTERBANK_ADD'),
+        ('收取利息、手续费及佣金的现金', 'RECEIVE_INTEREST_COMMISSION'),
+        ('收到的税费返还', 'RECEIVE_TAX_REFUND'),
+        ('收到其他与经营活动有关的现金', 'RECEIVE_OTHER_OPERATE'),
+        ('经营活动现金流入小计', 'TOTAL_OPERATE_INFLOW'),
+        ('购买商品、接受劳务支付的现金', 'BUY_SERVICES'),
+        ('客户贷款及垫款净增加额', 'LOAN_ADVANCE_ADD'),
+        ('存放中央银行和同业款项净增加额', 'PBC_INTERBANK_ADD'),
+        ('支付利息、手续费及佣金的现金', 'PAY_INTEREST_COMMISSION'),
+        ('支付给职工以及为职工支付的现金', 'PAY_STAFF_CASH'),
+        ('支付的各项税费', 'PAY_ALL_TAX'),
+        ('支付其他与经营活动有关的现金', 'PAY_OTHER_OPERATE'),
+        ('经营活动现金流出小计', 'TOTAL_OPERATE_OUTFLOW'),
+        ('经营活动产生的现金流量净额', 'NETCASH_OPERATE'),
+    ],
+    '投资活动': [
+        ('收回投资收到的现金', 'WITHDRAW_INVEST'),
+        ('取得投资收益收到的现金', 'RECEIVE_INVEST_INCOME'),
+        ('处置固定资产、无形资产和其他长期资产收回的现金净额', 'DISPOSAL_LONG_ASSET'),
+        ('处置子公司及其他营业单位收到的现金', 'DISPOSAL_SUBSIDIARY_OTHER'),
+        ('收到其他与投资活动有关的现金', 'RECEIVE_OTHER_INVEST'),
+        ('投资活动现金流入小计', 'TOTAL_INVEST_INFLOW'),
+        ('购建固定资产、无形资产和其他长期资产支付的现金', 'CONSTRUCT_LONG_ASSET'),
+        ('投资支付的现金', 'INVEST_PAY_CASH'),
+        ('取得子公司及其他营业单位支付的现金净额', 'OBTAIN_SUBSIDIARY_OTHER'),
+        ('支付其他与投资活动有关的现金', 'PAY_OTHER_INVEST'),
+        ('投资活动现金流出小计', 'TOTAL_INVEST_OUTFLOW'),
+        ('投资活动产生的现金流量净额', 'NETCASH_INVEST'),
+    ],
+    '筹资活动': [
+        ('吸收投资收到的现金', 'ACCEPT_INVEST_CASH'),
+        ('子公司吸收少数股东投资收到的现金', 'SUBSIDIARY_ACCEPT_INVEST'),
+        ('取得借款收到的现金', 'RECEIVE_LOAN_CASH'),
+        ('发行债券收到的现金', 'ISSUE_BOND'),
+        ('收到其他与筹资活动有关的现金', 'RECEIVE_OTHER_FINANCE'),
+        ('筹资活动现金流入小计', 'TOTAL_FINANCE_INFLOW'),
+        ('偿还债务支付的现金', 'PAY_DEBT_CASH'),
+        ('分配股利、利润或偿付利息支付的现金', 'ASSIGN_DIVIDEND_PORFIT'),
+        ('子公司支付给少数股东的股利、利润', 'SUBSIDIARY_PAY_DIVIDEND'),
+        ('支付其他与筹资活动有关的现金', 'PAY_OTHER_FINANCE'),
+        ('筹资活动现金流出小计', 'TOTAL_FINANCE_OUTFLOW'),
+        ('筹资活动产生的现金流量净额', 'NETCASH_FINANCE'),
+    ],
+    '现金及现金等价物': [
+        ('汇率变动对现金及现金等价物的影响', 'RATE_CHANGE_EFFECT'),
+        ('现金及现金等价物净增加额', 'CCE_ADD'),
+        ('期初现金及现金等价物余额', 'BEGIN_CCE'),
+        ('期末现金及现金等价物余额', 'END_CCE'),
+    ],
+}
+
+def field_keys(keys: FieldKeys) -> Tuple[str, ...]:
+    """把单个字段或字段元组统一为元组"""
+    return (keys,) if isinstance(keys, str) else tuple(keys)
+
+
+def schema_keys(schema: Schema) -> List[str]:
+    """schema 中用到的全部数值字段(去重，保持顺序)"""
+    keys: Dict[str, None] = {}
+    for fields in schema.values():
+        for _, field in fields:
+            for key in field_keys(field):
+                keys[key] = None
+    return list(keys)
+
+
+def collect_response_rows(responses: Union[dict, Iterable[dict]]) -> List[dict]:
+    """从一个或多个接口响应中取出数据行，忽略失败的响应"""
+    if isinstance(responses, dict):
+        responses = [responses]
+    rows: List[dict] = []
+    for response_data in responses:
+        if response_data and response_data.get('success'):
+            rows.extend((response_data.get('result') or {}).get('data') or [])
+    return rows
+
+
+def _date_column(values: List[Optional[str]]) -> np.ndarray:
+    """'2024-03-31 00:00:00' -> '2024-03-31'，通过定长字符串截断一次完成"""
+    dates = np.array([value or '' for value in values], dtype='U10')
+    result = dates.astype('object')
+    result[dates == ''] = None
+    return result
+
+
+def parse_statement_frame(responses: Union[dict, Iterable[dict]], schema: Schema) -> pd.DataFrame:
+    """把一个或一批接口响应一次性解析为按列存储的 DataFrame
+
+    - 只保留 schema 中的字段(列投影)
+    - 数值字段统一为 float64，缺失值按 0 处理
+    - REPORT_DATE/NOTICE_DATE 截取为 YYYY-MM-DD
+
+    返回:
+        列为 REPORT_DATE + 基本信息字段 + 数值字段(接口字段名)的 DataFrame
+    """
+    keys = schema_keys(schema)
+    rows = collect_response_rows(responses)
+
+    # 数值列: 按列投影一次构建，整块转换为 float64 矩阵，None/缺失按 0 处理
+    values = pd.DataFrame.from_records(rows, columns=keys).to_numpy(dtype='float64', na_value=0.0)
+
+    columns = {}
+    for key in ['REPORT_DATE'] + INFO_KEYS:
+        column = [item.get(key) for item in rows]
+        columns[key] = _date_column(column) if key in DATE_KEYS else np.array(column, dtype='object')
+    info = pd.DataFrame(columns)
+
+    return pd.concat([info, pd.DataFrame(values, columns=keys)], axis=1)
+
+
+def _compile_sections(schema: Schema) -> List[Tuple[str, list]]:
+    """把每个分组拆成若干段: 连续的单字段科目为一段，多字段相加的科目单独一段
+
+    这样绝大多数分组只需一次字典推导，无需对每个科目判断字段类型
+    """
+    sections = []
+    for section, fields in schema.items():
+        segments: list = []
+        for label, field in fields:
+            if isinstance(field, str):
+                if not segments or segments[-1][0] is not None:
+                    segments.append((None, []))
+                segments[-1][1].append((label, field))
+            else:
+                segments.append((label, tuple(field)))
+        sections.append((section, segments))
+    return sections
+
+
+_compiled_sections: Dict[int, List[Tuple[str, list]]] = {}
+
+
+def parse_statement_records(response_data: dict, schema: Schema) -> List[Tuple[str, dict]]:
+    """把单个接口响应解析为 [(报告期, 嵌套字典记录), ...]
+
+    单只股票的响应只有几行，逐行按 schema 构建字典，省去 DataFrame 的固定开销
+    """
+    sections = _compiled_sections.get(id(schema))
+    if sections is None:
+        sections = _compiled_sections[id(schema)] = _compile_sections(schema)
+
+    records = []
+    for item in collect_response_rows(response_data):
+        get = item.get
+        record = {'基本信息': {label: get(key) for label, key in INFO_FIELDS}}
+        record['基本信息']['公告日期'] = (get('NOTICE_DATE') or '').split(' ')[0]
+        for section, segments in sections:
+            if len(segments) == 1 and segments[0][0] is None:
+                record[section] = {label: get(key, 0) or 0 for label, key in segments[0][1]}
+                continue
+            values = record[section] = {}
+            for composite_label, fields in segments:
+                if composite_label is None:
+                    values.update({label: get(key, 0) or 0 for label, key in fields})
+                else:
+                    values[composite_label] = sum(get(key, 0) or 0 for key in fields)
+        records.append(((get('REPORT_DATE') or '').split(' ')[0], record))
+    return records
@@ -0,0 +1,184 @@
+"""按 (股票代码, 报告期) 存储解析后报表的线程安全内存仓库
+
+数据按股票代码分片，每个分片一把读写锁:
+- 同一分片允许多个读者并发读取
+- 批量写入按分片序号依次加写锁，全部写完后再释放，读者看不到写了一半的批次
+- 每次写入(含删除、清空)都会更新相关股票的版本号，下游缓存据此按股票判断是否失效
+"""
+import itertools
+from contextlib import contextmanager
+from threading import Condition, Lock
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class ReadWriteLock:
+    """读写锁: 多读者共享，写者独占(写者优先，避免写饥饿)"""
+
+    def __init__(self):
+        self._cond = Condition(Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class StatementStore(Generic[T]):
+    """多股票报表仓库: {股票代码: {报告期: 记录}}"""
+
+    def __init__(self, shards: int = 16):
+        self._shards: List[Dict[str, Dict[str, T]]] = [{} for _ in range(shards)]
+        self._locks = [ReadWriteLock() for _ in range(shards)]
+        # 股票代码 -> 最近一次写入的版本号(全局递增)；股票被删除后仍保留，以便下游发现删除
+        self._versions: List[Dict[str, int]] = [{} for _ in range(shards)]
+        self._counter = itertools.count(1)
+
+    def _shard(self, stock_code: str) -> int:
+        return hash(stock_code) % len(self._shards)
+
+    @contextmanager
+    def _read_all(self):
+        """按序号依次获取全部分片的读锁，得到一致的全局视图"""
+        acquired = []
+        try:
+            for lock in self._locks:
+                lock.acquire_read()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release_read()
+
+    def put(self, stock_code: str, report_date: str, record: T):
+        index = self._shard(stock_code)
+        with self._locks[index].write_locked():
+            self._shards[index].setdefault(stock_code, {})[report_date] = record
+            self._versions[index][stock_code] = next(self._counter)
+
+    def put_many(self, items: Iterable[Tuple[str, str, T]]) -> int:
+        """原子批量写入 [(股票代码, 报告期, 记录), ...]，返回写入条数"""
+        grouped: Dict[int, List[Tuple[str, str, T]]] = {}
+        for item in items:
+            grouped.setdefault(self._shard(item[0]), []).append(item)
+
+        indices = sorted(grouped)
+        acquired = []
+        try:
+            # 固定按分片序号加锁，避免并发批量写入之间死锁
+            for index in indices:
+                self._locks[index].acquire_write()
+                acquired.append(index)
+            for index in indices:
+                shard, versions = self._shards[index], self._versions[index]
+                for stock_code, report_date, record in grouped[index]:
+                    shard.setdefault(stock_code, {})[report_date] = record
+                version = next(self._counter)
+                versions.update(dict.fromkeys((item[0] for item in grouped[index]), version))
+        finally:
+            for index in reversed(acquired):
+                self._locks[index].release_write()
+        return sum(len(group) for group in grouped.values())
+
+    def get(self, stock_code: str, report_date: str) -> Optional[T]:
+        index = self._shard(stock_code)
+        with self._locks[index].read_locked():
+            return self._shards[index].get(stock_code, {}).get(report_date)
+
+    def periods_of(self, stock_code: str) -> Dict[str, T]:
+        """某只股票的全部报告期，按报告期升序"""
+        index = self._shard(stock_code)
+        with self._locks[index].read_locked():
+            periods = self._shards[index].get(stock_code, {})
+            return {date: periods[date] for date in sorted(periods)}
+
+    def stocks_for(self, report_date: str) -> Dict[str, T]:
+        """某个报告期的全部股票，按股票代码排序"""
+        result = {}
+        with self._read_all():
+            for shard in self._shards:
+                for stock_code, periods in shard.items():
+                    if report_date in periods:
+                        result[stock_code] = periods[report_date]
+        return dict(sorted(result.items()))
+
+    def items(self) -> List[Tuple[str, str, T]]:
+        """全部记录 [(股票代码, 报告期, 记录), ...]，按股票代码和报告期排序"""
+        with self._read_all():
+            items = [
+                (stock_code, report_date, record)
+                for shard in self._shards
+                for stock_code, periods in shard.items()
+                for report_date, record in periods.items()
+            ]
+        return sorted(items, key=lambda item: (item[0], item[1]))
+
+    def stock_codes(self) -> List[str]:
+        with self._read_all():
+            return sorted(code for shard in self._shards for code in shard)
+
+    def report_dates(self) -> List[str]:
+        with self._read_all():
+            return sorted({date for shard in self._shards for periods in shard.values() for date in periods})
+
+    def versions(self) -> Dict[str, int]:
+        """每只写入过的股票的版本号；版本号不变说明该股票的数据自上次读取后没有变化"""
+        with self._read_all():
+            return {code: version for versions in self._versions for code, version in versions.items()}
+
+    def remove(self, stock_code: str):
+        index = self._shard(stock_code)
+        with self._locks[index].write_locked():
+            if self._shards[index].pop(stock_code, None) is not None:
+                self._versions[index][stock_code] = next(self._counter)
+
+    def clear(self):
+        for index, lock in enumerate(self._locks):
+            with lock.write_locked():
+                version = next(self._counter)
+                self._versions[index].update(dict.fromkeys(self._shards[index], version))
+                self._shards[index].clear()
+
+    def __len__(self) -> int:
+        with self._read_all():
+            return sum(len(periods) for shard in self._shards for periods in shard.values())
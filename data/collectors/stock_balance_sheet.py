@@ -1,11 +1,59 @@
-import requests
+import logging
 import pandas as pd
 import re
+import time
+from collections import OrderedDict
 from threading import Lock
-from typing import Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from data.base_api import aktools_runner
+from data.base_api.http_client import global_http_client
+from data.base_api.instrumentation import PARSE_SECONDS, ROWS_PARSED
+from data.base_api.json_stream import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+# 缓存默认配置
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512MB
+DEFAULT_TTL: Optional[float] = None    # 默认不过期
+
+# 流式解析全市场数据时每块的行数
+DEFAULT_CHUNK_ROWS = 2000
+CODE_COLUMN = "股票代码"
+
+_UNSET = object()
+
+
+def _copy_on_write_enabled() -> bool:
+    """pandas 3 默认启用写时复制，pandas 2.x 需要打开 mode.copy_on_write"""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return getattr(pd.options.mode, 'copy_on_write', False) is True
+
+
+def _share(data: pd.DataFrame) -> pd.DataFrame:
+    """写时复制下返回共享底层数据的浅拷贝(O(1))，否则退回深拷贝"""
+    return data.copy(deep=not _copy_on_write_enabled())
+
+
+class _CacheEntry:
+    __slots__ = ('data', 'nbytes', 'expires_at')
+
+    def __init__(self, data: pd.DataFrame, nbytes: int, expires_at: Optional[float]):
+        self.data = data
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+
 
 # 全局存储结构
 class FinancialDataStore:
+    """进程内资产负债表缓存(单例)
+
+    单只股票的数据与全市场快照共用一个 LRU 队列和字节预算:
+    - 每次命中都会把条目移到队尾，超出预算时从队首(最久未使用)开始淘汰
+    - 条目可设置 TTL，过期后视为未命中
+    - 字节数按 DataFrame.memory_usage(deep=True) 计算
+    """
     _instance = None
     _lock = Lock()
 
@@ -13,81 +61,338 @@ class FinancialDataStore:
         with cls._lock:
             if not cls._instance:
                 cls._instance = super().__new__(cls)
-                cls._instance._balance_sheets: Dict[str, Dict[str, pd.DataFrame]] = {}
+                # 键: ('sheet', 股票代码, 报告日期) 或 ('snapshot', 报告日期)
+                cls._instance._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+                cls._instance._bytes = 0
+                cls._instance.max_bytes = DEFAULT_MAX_BYTES
+                cls._instance.default_ttl = DEFAULT_TTL
+                cls._instance._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
                 cls._instance._cache_lock = Lock()
             return cls._instance
 
-    def update_balance_sheet(self, stock_code: str, date: str, data: pd.DataFrame):
-        """线程安全的数据更新"""
+    def configure(self, max_bytes: Optional[int] = None, default_ttl=_UNSET):
+        """调整字节预算和默认 TTL(秒，None 表示不过期)，立即按新预算淘汰"""
+        with self._cache_lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if default_ttl is not _UNSET:
+                self.default_ttl = default_ttl
+            self._evict_locked()
+
+    def _put_locked(self, key: Tuple, data: pd.DataFrame, ttl: Optional[float]):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        nbytes = int(data.memory_usage(deep=True, index=True).sum())
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        self._entries[key] = _CacheEntry(data, nbytes, expires_at)
+        self._bytes += nbytes
+        self._evict_locked()
+
+    def _get_locked(self, key: Tuple) -> Optional[pd.DataFrame]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats['misses'] += 1
+            return None
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove_locked(key)
+            self._stats['expirations'] += 1
+            self._stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats['hits'] += 1
+        return entry.data
+
+    def _remove_locked(self, key: Tuple):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.nbytes
+
+    def _evict_locked(self, max_items: Optional[int] = None):
+        """从最久未使用的条目开始淘汰，始终保留最新写入的一条"""
+        while len(self._entries) > 1 and (
+                self._bytes > self.max_bytes or (max_items is not None and len(self._entries) > max_items)):
+            key = next(iter(self._entries))
+            self._remove_locked(key)
+            self._stats['evictions'] += 1
+
+    def update_balance_sheet(self, stock_code: str, date: str, data: pd.DataFrame, ttl: Optional[float] = None):
+        """线程安全的数据更新
+
+        写时复制下只保存浅拷贝，调用方之后修改自己的 DataFrame 不会影响缓存
+        """
+        data = _share(data)
+        with self._cache_lock:
+            self._put_locked(('sheet', stock_code, date), data, ttl)
+
+    def get_balance_sheet(self, stock_code: str, date: str, copy: bool = True) -> Optional[pd.DataFrame]:
+        """获取缓存数据，锁只在查找期间持有
+
+        参数:
+            copy: True 返回深拷贝；False 返回只读视图，写时复制下不复制数据，
+                  对视图的修改会触发 pandas 复制而不会写回缓存
+        """
+        with self._cache_lock:
+            data = self._get_locked(('sheet', stock_code, date))
+        if data is None:
+            return None
+        return data.copy() if copy else _share(data)
+
+    def update_snapshot(self, date: str, data: pd.DataFrame, ttl: Optional[float] = None,
+                        copy: bool = True) -> pd.DataFrame:
+        """保存某报告日期的全市场快照，并按股票代码建立索引
+
+        参数:
+            copy: 调用方之后不再使用 data 时可传 False，省去一次整表复制
+        """
+        snapshot = data.copy() if copy else data
+        snapshot["股票代码"] = snapshot["股票代码"].astype(str)
+        snapshot = snapshot.set_index("股票代码", drop=False).sort_index()
+        with self._cache_lock:
+            self._put_locked(('snapshot', date), snapshot, ttl)
+        return _share(snapshot)
+
+    def get_snapshot(self, date: str) -> Optional[pd.DataFrame]:
+        """获取某报告日期的全市场快照
+
+        与 get_balance_sheet(copy=False) 相同: 写时复制下返回共享数据的浅拷贝，
+        调用方修改返回值不会写回缓存
+        """
+        snapshot = self._snapshot(date)
+        return _share(snapshot) if snapshot is not None else None
+
+    def _snapshot(self, date: str) -> Optional[pd.DataFrame]:
+        """缓存中的快照对象本身，只供只读查找使用，不能交给调用方"""
+        with self._cache_lock:
+            return self._get_locked(('snapshot', date))
+
+    def has_snapshot(self, date: str) -> bool:
         with self._cache_lock:
-            if stock_code not in self._balance_sheets:
-                self._balance_sheets[stock_code] = {}
-            self._balance_sheets[stock_code][date] = data.copy()
+            entry = self._entries.get(('snapshot', date))
+            return entry is not None and (entry.expires_at is None or entry.expires_at > time.monotonic())
 
-    def get_balance_sheet(self, stock_code: str, date: str) -> Optional[pd.DataFrame]:
-        """安全获取数据副本"""
+    def lookup_snapshot(self, stock_code: str, date: str) -> Optional[pd.DataFrame]:
+        """从全市场快照中查找单只股票
+
+        返回:
+            快照不存在时返回 None；快照存在但无该股票时返回空 DataFrame
+        """
+        snapshot = self._snapshot(date)
+        if snapshot is None:
+            return None
+        if stock_code not in snapshot.index:
+            return snapshot.iloc[0:0].reset_index(drop=True)
+        return snapshot.loc[[stock_code]].reset_index(drop=True)
+
+    def cached_keys(self) -> List[Tuple]:
+        """当前缓存的键，按最久未使用到最近使用排列"""
         with self._cache_lock:
-            try:
-                return self._balance_sheets[stock_code][date].copy()
-            except KeyError:
-                return None
+            return list(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """命中/未命中/淘汰计数及当前占用"""
+        with self._cache_lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def reset_stats(self):
+        with self._cache_lock:
+            for key in self._stats:
+                self._stats[key] = 0
 
     def clear_cache(self, max_items=1000):
-        """缓存清理机制"""
+        """缓存清理机制: 条目数超过 max_items 时按 LRU 淘汰到 max_items 条"""
+        with self._cache_lock:
+            self._evict_locked(max_items)
+
+    def clear(self):
+        """清空全部缓存"""
         with self._cache_lock:
-            total = sum(len(v) for v in self._balance_sheets.values())
-            if total > max_items:
-                self._balance_sheets.clear()
+            self._entries.clear()
+            self._bytes = 0
 
 # 单例初始化
 global_store = FinancialDataStore()
 
-def get_balance_sheet(stock_code: str, date: str = "20240331") -> pd.DataFrame:
+# 每个报告日期一把锁，避免并发请求同一日期时重复下载全市场数据
+_snapshot_locks: Dict[str, Lock] = {}
+_snapshot_locks_guard = Lock()
+
+
+def _get_snapshot_lock(date: str) -> Lock:
+    with _snapshot_locks_guard:
+        if date not in _snapshot_locks:
+            _snapshot_locks[date] = Lock()
+        return _snapshot_locks[date]
+
+
+def _normalize_stock_code(stock_code: str) -> str:
+    """提取6位股票代码(兼容 600519 / 600519.SH / 600519.SS 等写法)"""
+    code_match = re.search(r"\d{6}", stock_code)
+    if not code_match:
+        raise ValueError("股票代码必须包含6位连续数字")
+    return code_match.group()
+
+
+def _project(columns: Optional[Iterable[str]]) -> Optional[List[str]]:
+    """列投影: 股票代码列放在第一列并总是保留"""
+    if columns is None:
+        return None
+    return [CODE_COLUMN] + [column for column in dict.fromkeys(columns) if column != CODE_COLUMN]
+
 
+def stream_balance_sheet_date(date: str = "20240331", stock_codes: Optional[Iterable[str]] = None,
+                              columns: Optional[Iterable[str]] = None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                              refresh: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    流式下载并解析某报告日期的全市场资产负债表，按块产出 DataFrame
+
+    响应体边下载边解析，每条记录到达时就做股票代码过滤和列投影，满 chunk_rows 行构建一块；
+    内存中只保留当前一块的原始记录，不会同时存在整个响应体、整个 JSON 列表和整张表
+
+    参数:
+        date: 报告日期(YYYYMMDD)
+        stock_codes: 只保留这些股票(兼容 600519 / 600519.SH 等写法)，默认全部
+        columns: 只保留这些列(股票代码列总会保留)，默认全部
+        chunk_rows: 每块的行数
+        refresh: 是否跳过磁盘响应缓存重新下载
+    """
+    codes = {_normalize_stock_code(code) for code in stock_codes} if stock_codes is not None else None
+    columns = _project(columns)
+
+    chunks = global_http_client.iter_bytes(aktools_runner.aktools_url('stock_zcfz_em'), params={'date': date},
+                                           refresh=refresh)
+    # 解析耗时不含等待网络和调用方处理每块的时间
+    busy, resumed = 0.0, time.perf_counter()
+    total = kept = 0
+    rows: list = []
+    for record in iter_json_array(chunks):
+        total += 1
+        code = record.get(CODE_COLUMN) if isinstance(record, dict) else None
+        if code is None:
+            raise ValueError(f"{date} 的资产负债表数据缺少股票代码列")
+        code = record[CODE_COLUMN] = str(code)
+        if codes is not None and code not in codes:
+            continue
+        rows.append(record if columns is None else [record.get(column) for column in columns])
+        if len(rows) >= chunk_rows:
+            frame = pd.DataFrame(rows, columns=columns)
+            kept += len(rows)
+            ROWS_PARSED.inc(len(rows), statement='snapshot')
+            rows = []
+            busy += time.perf_counter() - resumed
+            yield frame
+            resumed = time.perf_counter()
 
+    if rows:
+        kept += len(rows)
+        ROWS_PARSED.inc(len(rows), statement='snapshot')
+        frame = pd.DataFrame(rows, columns=columns)
+        rows = []
+        busy += time.perf_counter() - resumed
+        yield frame
+    else:
+        busy += time.perf_counter() - resumed
+    PARSE_SECONDS.observe(busy, statement='snapshot')
+    logger.info("已解析 %s 的全市场资产负债表，共 %d 行，保留 %d 行", date, total, kept)
+
+
+def _concat_chunks(chunks: Iterable[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """合并各块；某块中整列为空时该列是 object 类型，合并后重新推断"""
+    frames = list(chunks)
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).infer_objects()
+
+
+def prefetch_balance_sheet_date(date: str = "20240331", force: bool = False,
+                                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> pd.DataFrame:
+    """
+    预取某报告日期的全市场资产负债表快照(流式解析，见 stream_balance_sheet_date)
+
+    参数:
+        date: 报告日期(YYYYMMDD)
+        force: 是否忽略已有快照强制重新下载
+        chunk_rows: 流式解析时每块的行数
+
+    返回:
+        以股票代码为索引的全市场快照 DataFrame；该报告期没有数据时抛出 ValueError
+    """
+    with _get_snapshot_lock(date):
+        if not force:
+            snapshot = global_store.get_snapshot(date)
+            if snapshot is not None:
+                return snapshot
+
+        df = _concat_chunks(stream_balance_sheet_date(date, chunk_rows=chunk_rows, refresh=force))
+        if df is None:
+            # 接口返回空数组: 该报告期尚无披露，或日期不是报告期
+            raise ValueError(f"{date} 没有资产负债表数据(该报告期可能尚未披露，或不是有效的报告期)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("aktools 原始数据(前 3 行): %s", df.head(3).to_dict('records'))
+        return global_store.update_snapshot(date, df, copy=False)
+
+
+def get_balance_sheets(stock_codes: Iterable[str], date: str = "20240331",
+                       columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    批量获取多只股票某报告日期的资产负债表
+
+    已有全市场快照时直接从快照中选取；否则流式下载，只保留这些股票和 columns 指定的列，
+    不在内存中构建全市场快照(只需要少数股票时峰值内存与全市场规模无关)
+    """
+    codes = list(dict.fromkeys(_normalize_stock_code(code) for code in stock_codes))
+    columns = _project(columns)
+
+    snapshot = global_store._snapshot(date)
+    if snapshot is not None:
+        result = snapshot[snapshot.index.isin(codes)]
+        if columns is not None:
+            result = result[columns]
+        return result.reset_index(drop=True)
+
+    result = _concat_chunks(stream_balance_sheet_date(date, stock_codes=codes, columns=columns))
+    return result if result is not None else pd.DataFrame(columns=columns or [CODE_COLUMN])
+
+
+def get_balance_sheet(stock_code: str, date: str = "20240331", copy: bool = True) -> pd.DataFrame:
     """
     增强版数据获取函数，自动缓存到全局存储
+
+    同一报告日期只下载一次全市场数据，之后的股票均从内存快照中查找；
+    copy=False 时从缓存返回不复制数据的只读视图(见 FinancialDataStore.get_balance_sheet)
     """
     try:
+        clean_code = _normalize_stock_code(stock_code)
+
         # 优先检查缓存
-        cached_data = global_store.get_balance_sheet(stock_code, date)
+        cached_data = global_store.get_balance_sheet(clean_code, date, copy=copy)
         if cached_data is not None:
             return cached_data
 
-        # 使用 requests 获取数据
-        params = {'date': date}
-        response = requests.get(
-            url='http://127.0.0.1:8080/api/public/stock_zcfz_em',  # 替换为实际地址
-            params=params
-        )
-
-        # 检查响应状态
-        response.raise_for_status()
-
-        # 解析 JSON 数据并转换为 DataFrame
-        data = response.json()
-        print(data)
-        df = pd.DataFrame(data)
-
-        # 检查股票代码格式并过滤数据
-        code_match = re.search(r"\d{6}", stock_code)
-        if not code_match:
-            raise ValueError("股票代码必须包含6位连续数字")
-
-        clean_code = code_match.group()
-        df["股票代码"] = df["股票代码"].astype(str)
-        result_df = df[df["股票代码"] == clean_code]
+        # 其次查找全市场快照，不存在时下载一次
+        result_df = global_store.lookup_snapshot(clean_code, date)
+        if result_df is None:
+            prefetch_balance_sheet_date(date)
+            result_df = global_store.lookup_snapshot(clean_code, date)
 
-        if result_df.empty:
+        if result_df is None or result_df.empty:
             raise ValueError(f"未找到股票代码 {clean_code} 的资产负债表数据")
 
         # 更新全局存储
         global_store.update_balance_sheet(clean_code, date, result_df)
 
-        return result_df.copy()
+        return result_df
 
     except Exception as e:
-        print(f"数据获取失败：{str(e)}")
+        logger.warning("数据获取失败：%s", e)
         return pd.DataFrame()
 
 # 使用示例
@@ -99,5 +404,5 @@ if __name__ == "__main__":
     cached_df = global_store.get_balance_sheet("600519", "20240331")
 
     # 打印存储结构
-    print("当前存储的股票代码:", list(global_store._balance_sheets.keys()))
-    print("600519的报表日期:", list(global_store._balance_sheets["600519"].keys()))
+    print("当前缓存的条目:", global_store.cached_keys())
+    print("缓存统计:", global_store.stats())
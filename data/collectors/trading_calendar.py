@@ -0,0 +1,184 @@
+"""沪深交易所交易日历
+
+交易日保存为有序的 datetime64[D] 数组，同时按自然日建立位图和累计计数:
+- is_trading_day: 位图直接取值，O(1)
+- 下一个/上一个交易日、区间内交易日数量: 累计计数取差，O(1)
+所有查询都接受单个日期或整列日期
+
+交易日历可从本地文件(每行一个日期，或带 trade_date 列的 CSV)加载，并可通过 aktools 的
+tool_trade_date_hist_sina 接口刷新后写回文件；本地文件不存在时首次使用会先下载，下载失败则报错，
+不会退化为只排除周末的近似日历(那样会把节假日误判为交易日)
+"""
+import logging
+import os
+from datetime import date
+from threading import Lock
+from typing import Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from data.base_api import aktools_runner
+from data.base_api.http_client import global_http_client
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, np.datetime64]
+DatesLike = Union[DateLike, Iterable[DateLike], np.ndarray]
+
+DEFAULT_CALENDAR_PATH = os.environ.get(
+    "TRADING_CALENDAR_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "trading_calendar.csv")
+)
+
+
+class TradingCalendar:
+    """交易日历"""
+
+    def __init__(self, trading_days: DatesLike):
+        days = np.unique(np.asarray(trading_days, dtype='datetime64[D]'))
+        if not len(days):
+            raise ValueError("交易日历为空")
+        self.trading_days = days
+        self.start = days[0]
+        self.end = days[-1]
+
+        # 位图: 自 start 起第 i 天是否为交易日；累计计数: 截至第 i 天(含)的交易日数量
+        self._open = np.zeros((self.end - self.start).astype(int) + 1, dtype=bool)
+        self._open[(days - self.start).astype(int)] = True
+        self._count = np.cumsum(self._open)
+
+    @classmethod
+    def weekdays(cls, start: str = '1990-12-19', end: Optional[str] = None) -> 'TradingCalendar':
+        """只排除周末的近似日历(不含法定节假日)"""
+        end = end or f"{date.today().year + 1}-12-31"
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        return cls(days[np.is_busday(days)])
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_CALENDAR_PATH) -> 'TradingCalendar':
+        """从本地文件加载: 每行一个日期，或第一列/trade_date 列为日期的 CSV"""
+        frame = pd.read_csv(path, dtype=str, comment='#')
+        column = 'trade_date' if 'trade_date' in frame.columns else frame.columns[0]
+        values = frame[column].tolist()
+        # 没有表头的单列文件，第一行日期被当成了列名
+        if column != 'trade_date' and not pd.isna(pd.to_datetime(column, errors='coerce')):
+            values.insert(0, column)
+        return cls(pd.to_datetime(pd.Series(values).str.strip()).to_numpy(dtype='datetime64[D]'))
+
+    def save(self, path: str = DEFAULT_CALENDAR_PATH):
+        tmp_path = f"{path}.tmp"
+        pd.DataFrame({'trade_date': self.trading_days.astype(str)}).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _as_days(dates: DatesLike) -> np.ndarray:
+        return np.asarray(dates, dtype='datetime64[D]')
+
+    def _offsets(self, days: np.ndarray) -> np.ndarray:
+        """日期相对 start 的天数，超出日历范围时报错"""
+        if np.any(days < self.start) or np.any(days > self.end):
+            raise ValueError(f"日期超出交易日历范围 {self.start} ~ {self.end}")
+        return (days - self.start).astype(int)
+
+    def is_trading_day(self, dates: DatesLike) -> Union[bool, np.ndarray]:
+        """是否为交易日；超出日历范围的日期视为非交易日"""
+        days = self._as_days(dates)
+        inside = (days >= self.start) & (days <= self.end)
+        offsets = np.where(inside, (days - self.start).astype(int), 0)
+        result = inside & self._open[offsets]
+        return bool(result) if result.ndim == 0 else result
+
+    def previous(self, dates: DatesLike) -> np.ndarray:
+        """当天或之前最近的交易日"""
+        counts = self._count[self._offsets(self._as_days(dates))]
+        return self.trading_days[counts - 1]
+
+    def next(self, dates: DatesLike) -> np.ndarray:
+        """当天或之后最近的交易日"""
+        offsets = self._offsets(self._as_days(dates))
+        # 严格早于当天的交易日数量即为当天或之后第一个交易日的位置
+        return self.trading_days[self._count[offsets] - self._open[offsets]]
+
+    def snap(self, dates: DatesLike, direction: str = 'previous') -> np.ndarray:
+        """把日期(整列)对齐到交易日: previous 向前取，next 向后取"""
+        if direction == 'previous':
+            return self.previous(dates)
+        if direction == 'next':
+            return self.next(dates)
+        raise ValueError(f"不支持的对齐方向: {direction}")
+
+    def shift(self, dates: DatesLike, count: int) -> np.ndarray:
+        """当天或之前最近的交易日再向后(正数)或向前(负数)移动 count 个交易日"""
+        positions = self._count[self._offsets(self._as_days(dates))] - 1 + count
+        if np.any(positions < 0) or np.any(positions >= len(self.trading_days)):
+            raise ValueError(f"移动 {count} 个交易日超出交易日历范围")
+        return self.trading_days[positions]
+
+    def trading_days_between(self, start: DatesLike, end: DatesLike) -> Union[int, np.ndarray]:
+        """[start, end] 闭区间内的交易日数量，start 晚于 end 时为 0"""
+        start_offsets = self._offsets(self._as_days(start))
+        end_offsets = self._offsets(self._as_days(end))
+        counts = self._count[end_offsets] - self._count[start_offsets] + self._open[start_offsets]
+        counts = np.maximum(counts, 0)
+        return int(counts) if counts.ndim == 0 else counts
+
+    def __len__(self) -> int:
+        return len(self.trading_days)
+
+    def __contains__(self, day: DateLike) -> bool:
+        return self.is_trading_day(day)
+
+
+def fetch_trading_days(refresh: bool = False) -> np.ndarray:
+    """通过 aktools 获取新浪历史交易日历
+
+    参数:
+        refresh: 跳过磁盘响应缓存，直接请求接口
+    """
+    data = global_http_client.get_json(aktools_runner.aktools_url('tool_trade_date_hist_sina'), refresh=refresh)
+    frame = pd.DataFrame(data)
+    if 'trade_date' not in frame.columns:
+        raise ValueError("交易日历接口返回的数据缺少 trade_date 列")
+    return pd.to_datetime(frame['trade_date']).to_numpy(dtype='datetime64[D]')
+
+
+_trading_calendar: Optional[TradingCalendar] = None
+_calendar_lock = Lock()
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """获取全局交易日历
+
+    首次调用时从本地文件加载；文件不存在时下载并写回文件，下载失败抛出 RuntimeError
+    """
+    global _trading_calendar
+    with _calendar_lock:
+        if _trading_calendar is None:
+            if not os.path.exists(DEFAULT_CALENDAR_PATH):
+                logger.info("未找到交易日历文件 %s，正在下载", DEFAULT_CALENDAR_PATH)
+                try:
+                    TradingCalendar(fetch_trading_days(refresh=True)).save(DEFAULT_CALENDAR_PATH)
+                except Exception as exc:
+                    raise RuntimeError(
+                        f"未找到交易日历文件 {DEFAULT_CALENDAR_PATH}，下载也失败了: {exc}；"
+                        f"请确认 aktools 可用后调用 refresh_trading_calendar()，"
+                        f"或通过 TRADING_CALENDAR_PATH 指定日历文件"
+                    ) from exc
+            _trading_calendar = TradingCalendar.from_file(DEFAULT_CALENDAR_PATH)
+        return _trading_calendar
+
+
+def set_trading_calendar(calendar: TradingCalendar):
+    """替换全局交易日历"""
+    global _trading_calendar
+    with _calendar_lock:
+        _trading_calendar = calendar
+
+
+def refresh_trading_calendar(path: str = DEFAULT_CALENDAR_PATH) -> TradingCalendar:
+    """重新下载交易日历(不使用磁盘响应缓存)，写回本地文件并替换全局实例"""
+    calendar = TradingCalendar(fetch_trading_days(refresh=True))
+    calendar.save(path)
+    set_trading_calendar(calendar)
+    return calendar
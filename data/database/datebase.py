@@ -1,16 +1,228 @@
 # Database setup function
+import json
+import os
 import sqlite3
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+# 默认数据库文件，可通过环境变量 FINANCIAL_DB_PATH 覆盖
+DEFAULT_DATABASE_PATH = os.environ.get(
+    'FINANCIAL_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'financial_data.db')
+)
 
-def create_sample_database(database_name):
-    """创建一个新的数据库来暂存一些内容"""
-    def create_sqlite_database(filename):
-        conn = None
+# 报表类型 -> 数据表名
+STATEMENT_TABLES = {
+    'balance': 'balance_sheet',
+    'profit': 'profit_sheet',
+    'cashflow': 'cashflow_sheet',
+}
+
+_TABLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    SECUCODE TEXT NOT NULL,
+    REPORT_DATE TEXT NOT NULL,
+    NOTICE_DATE TEXT,
+    SECURITY_NAME_ABBR TEXT,
+    REPORT_TYPE TEXT,
+    CURRENCY TEXT,
+    payload TEXT NOT NULL,
+    record TEXT,
+    updated_at TEXT NOT NULL DEFAULT (datetime('now')),
+    PRIMARY KEY (SECUCODE, REPORT_DATE)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_{table}_code ON {table} (SECUCODE);
+CREATE INDEX IF NOT EXISTS idx_{table}_date ON {table} (REPORT_DATE);
+CREATE INDEX IF NOT EXISTS idx_{table}_notice ON {table} (NOTICE_DATE);
+"""
+
+_UPSERT_SQL = """
+INSERT INTO {table} (SECUCODE, REPORT_DATE, NOTICE_DATE, SECURITY_NAME_ABBR, REPORT_TYPE, CURRENCY, payload, record)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (SECUCODE, REPORT_DATE) DO UPDATE SET
+    NOTICE_DATE = excluded.NOTICE_DATE,
+    SECURITY_NAME_ABBR = excluded.SECURITY_NAME_ABBR,
+    REPORT_TYPE = excluded.REPORT_TYPE,
+    CURRENCY = excluded.CURRENCY,
+    payload = excluded.payload,
+    record = excluded.record,
+    updated_at = datetime('now')
+"""
+
+
+def _date_part(value) -> Optional[str]:
+    """'2024-03-31 00:00:00' -> '2024-03-31'"""
+    return value.split(' ')[0] if value else None
+
+
+class FinancialWarehouse:
+    """基于 SQLite 的财务报表仓库
+
+    每张报表一张表，以 (SECUCODE, REPORT_DATE) 为主键，同时保存接口原始数据和解析结果
+    """
+
+    def __init__(self, database_name: str = DEFAULT_DATABASE_PATH):
+        self.database_name = database_name
+        self._lock = Lock()
+        # isolation_level=None: 由我们显式控制事务
+        self._conn = sqlite3.connect(database_name, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            for table in STATEMENT_TABLES.values():
+                self._conn.executescript(_TABLE_SCHEMA.format(table=table))
+
+    def _table(self, statement: str) -> str:
         try:
-            conn = sqlite3.connect(filename)
-            print('数据库新建成功')
-        except sqlite3.Error as e:
-            print(e)
-        finally:
-            if conn:
-                conn.close()
+            return STATEMENT_TABLES[statement]
+        except KeyError:
+            raise ValueError(f"未知的报表类型: {statement}")
+
+    def upsert_rows(self, statement: str, rows: Iterable[Tuple[dict, Optional[dict]]]) -> int:
+        """在一个事务中批量写入(或更新)报表数据
+
+        参数:
+            statement: 报表类型，见 STATEMENT_TABLES
+            rows: (接口原始数据, 解析后的记录) 列表
+
+        返回:
+            写入的行数
+        """
+        params = [
+            (
+                item.get('SECUCODE'),
+                _date_part(item.get('REPORT_DATE')),
+                _date_part(item.get('NOTICE_DATE')),
+                item.get('SECURITY_NAME_ABBR'),
+                item.get('REPORT_TYPE'),
+                item.get('CURRENCY'),
+                json.dumps(item, ensure_ascii=False),
+                json.dumps(record, ensure_ascii=False) if record is not None else None,
+            )
+            for item, record in rows
+            if item.get('SECUCODE') and item.get('REPORT_DATE')
+        ]
+        if not params:
+            return 0
+
+        sql = _UPSERT_SQL.format(table=self._table(statement))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(params)
+
+    def get_rows(self, statement: str, stock_code: str,
+                 report_dates: Optional[Iterable[str]] = None) -> List[dict]:
+        """读取某只股票的接口原始数据，按报告期倒序"""
+        table = self._table(statement)
+        sql = f"SELECT payload FROM {table} WHERE SECUCODE = ?"
+        args: list = [stock_code]
+        if report_dates is not None:
+            report_dates = list(report_dates)
+            sql += f" AND REPORT_DATE IN ({','.join('?' * len(report_dates))})"
+            args.extend(report_dates)
+        sql += " ORDER BY REPORT_DATE DESC"
+
+        with self._lock:
+            cursor = self._conn.execute(sql, args)
+            return [json.loads(payload) for (payload,) in cursor.fetchall()]
+
+    def get_records(self, statement: str, stock_code: str) -> Dict[str, dict]:
+        """读取某只股票解析后的记录: {报告期: 记录}"""
+        table = self._table(statement)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT REPORT_DATE, record FROM {table} WHERE SECUCODE = ? AND record IS NOT NULL",
+                (stock_code,)
+            )
+            return {report_date: json.loads(record) for report_date, record in cursor.fetchall()}
+
+    def held_periods(self, statement: str, stock_codes: Iterable[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """已入库的报告期: {股票代码: {报告期: 公告日期}}"""
+        table = self._table(statement)
+        codes = list(stock_codes)
+        held: Dict[str, Dict[str, Optional[str]]] = {code: {} for code in codes}
+        with self._lock:
+            # 分批查询，避免超过 SQLite 的参数个数上限
+            for start in range(0, len(codes), 500):
+                chunk = codes[start:start + 500]
+                cursor = self._conn.execute(
+                    f"SELECT SECUCODE, REPORT_DATE, NOTICE_DATE FROM {table} "
+                    f"WHERE SECUCODE IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for code, report_date, notice_date in cursor.fetchall():
+                    held[code][report_date] = notice_date
+        return held
+
+    def get_response(self, statement: str, stock_code: str, report_dates: Iterable[str]) -> Optional[dict]:
+        """所有报告期都已入库时，返回与接口相同结构的响应，否则返回 None"""
+        report_dates = list(report_dates)
+        rows = self.get_rows(statement, stock_code, report_dates)
+        if len(rows) < len(set(report_dates)):
+            return None
+        return {
+            'success': True,
+            'message': 'ok',
+            'source': 'warehouse',
+            'result': {'data': rows, 'count': len(rows)},
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_global_warehouse: Optional[FinancialWarehouse] = None
+_warehouse_disabled = False
+_warehouse_lock = Lock()
+
+
+def get_warehouse() -> Optional[FinancialWarehouse]:
+    """获取全局仓库实例(首次调用时创建)，被禁用时返回 None"""
+    global _global_warehouse
+    with _warehouse_lock:
+        if _warehouse_disabled:
+            return None
+        if _global_warehouse is None:
+            _global_warehouse = FinancialWarehouse(DEFAULT_DATABASE_PATH)
+        return _global_warehouse
+
+
+def set_warehouse(warehouse: Optional[FinancialWarehouse]):
+    """替换全局仓库实例，传入 None 则禁用持久化"""
+    global _global_warehouse, _warehouse_disabled
+    with _warehouse_lock:
+        _global_warehouse = warehouse
+        _warehouse_disabled = warehouse is None
+
+
+@contextmanager
+def use_warehouse(warehouse: Optional[FinancialWarehouse]) -> Iterator[Optional[FinancialWarehouse]]:
+    """临时替换全局仓库实例(None 表示禁用持久化)，退出时恢复原来的实例和禁用状态"""
+    global _global_warehouse, _warehouse_disabled
+    with _warehouse_lock:
+        previous = (_global_warehouse, _warehouse_disabled)
+    set_warehouse(warehouse)
+    try:
+        yield warehouse
+    finally:
+        with _warehouse_lock:
+            _global_warehouse, _warehouse_disabled = previous
+
+
+def create_sample_database(database_name):
+    """创建(或打开)数据库并建好报表表结构"""
+    try:
+        warehouse = FinancialWarehouse(database_name)
+        print('数据库新建成功')
+        return warehouse
+    except sqlite3.Error as e:
+        print(e)
+        return None
@@ -0,0 +1,142 @@
+"""报表面板的 Parquet / Arrow IPC 分区导出与内存映射加载
+
+目录结构(按报告期分区，Hive 风格):
+    <root>/<报表类型>/REPORT_DATE=2024-03-31/part-0.parquet
+    <root>/<报表类型>/REPORT_DATE=2024-03-31/part-0.arrow
+
+Arrow IPC 文件以内存映射方式打开，数值列直接引用文件页，不经过 JSON 解析，也不逐行
+构造 Python 对象；只读取需要的列和报告期
+"""
+import os
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+DEFAULT_PANEL_ROOT = os.environ.get(
+    "FINANCIAL_PANEL_ROOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "panel")
+)
+
+PARTITION_KEY = 'REPORT_DATE'
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def _partition_dir(root: str, statement: str, report_date: str) -> str:
+    return os.path.join(root, statement, f"{PARTITION_KEY}={report_date}")
+
+
+def _write_table(table: pa.Table, path: str, fmt: str):
+    # 先写临时文件再替换，读者不会看到写了一半的分区
+    tmp_path = f"{path}.tmp"
+    if fmt == 'parquet':
+        pq.write_table(table, tmp_path, compression='zstd')
+    else:
+        with pa.OSFile(tmp_path, 'wb') as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def export_panel(frame: pd.DataFrame, statement: str, root: str = DEFAULT_PANEL_ROOT,
+                 fmt: str = 'parquet') -> Dict[str, int]:
+    """把报表 DataFrame(parse_statement_frame / records_to_frame 的结果)按报告期分区写出
+
+    同一报告期的分区会被整体覆盖
+
+    参数:
+        frame: 含 REPORT_DATE 列的报表 DataFrame
+        statement: 报表类型(balance/profit)，作为一级目录
+        root: 导出根目录
+        fmt: 'parquet'(压缩，适合归档) 或 'arrow'(未压缩，可内存映射零拷贝读取)
+
+    返回:
+        dict: {报告期: 行数}
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}")
+
+    written = {}
+    for report_date, partition in frame.groupby(PARTITION_KEY, sort=True):
+        report_date = str(report_date)
+        directory = _partition_dir(root, statement, report_date)
+        os.makedirs(directory, exist_ok=True)
+        # 切换格式时清除旧格式的文件，避免同一分区出现两份数据
+        for other in FORMATS.values():
+            stale = os.path.join(directory, f"part-0{other}")
+            if other != FORMATS[fmt] and os.path.exists(stale):
+                os.remove(stale)
+        table = pa.Table.from_pandas(partition.drop(columns=PARTITION_KEY), preserve_index=False)
+        _write_table(table, os.path.join(directory, f"part-0{FORMATS[fmt]}"), fmt)
+        written[report_date] = len(partition)
+    return written
+
+
+def export_stores(root: str = DEFAULT_PANEL_ROOT, fmt: str = 'parquet') -> Dict[str, Dict[str, int]]:
+    """导出报表引擎中全部报表的内存仓库"""
+    from data.collectors.statement_engine import statement_engine
+    from data.collectors.statement_record import records_to_frame
+
+    return {
+        statement: export_panel(records_to_frame(descriptor.store.items(), descriptor.schema), statement, root, fmt)
+        for statement, descriptor in statement_engine.statements.items()
+    }
+
+
+def partition_dates(statement: str, root: str = DEFAULT_PANEL_ROOT) -> List[str]:
+    """已导出的报告期，升序"""
+    directory = os.path.join(root, statement)
+    if not os.path.isdir(directory):
+        return []
+    prefix = f"{PARTITION_KEY}="
+    return sorted(name[len(prefix):] for name in os.listdir(directory) if name.startswith(prefix))
+
+
+def _read_partition(directory: str, columns: Optional[List[str]]) -> Optional[pa.Table]:
+    arrow_path = os.path.join(directory, f"part-0{FORMATS['arrow']}")
+    if os.path.exists(arrow_path):
+        # 内存映射: 表中的缓冲区直接指向文件页，按需由操作系统换入
+        table = ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+        return table.select(columns) if columns is not None else table
+    parquet_path = os.path.join(directory, f"part-0{FORMATS['parquet']}")
+    if os.path.exists(parquet_path):
+        return pq.read_table(parquet_path, columns=columns, memory_map=True)
+    return None
+
+
+def load_panel_table(statement: str, root: str = DEFAULT_PANEL_ROOT,
+                     columns: Optional[Iterable[str]] = None,
+                     report_dates: Optional[Iterable[str]] = None) -> pa.Table:
+    """以 Arrow 表的形式加载报表面板(不转换为 pandas)
+
+    参数:
+        statement: 报表类型(balance/profit)
+        root: 导出根目录
+        columns: 只读取这些列(列投影)，默认全部列；REPORT_DATE 列总会附带
+        report_dates: 只读取这些报告期(分区裁剪)，默认全部报告期
+    """
+    columns = [column for column in columns if column != PARTITION_KEY] if columns is not None else None
+    dates = partition_dates(statement, root)
+    if report_dates is not None:
+        wanted = set(report_dates)
+        dates = [date for date in dates if date in wanted]
+
+    tables = []
+    for report_date in dates:
+        table = _read_partition(_partition_dir(root, statement, report_date), columns)
+        if table is None:
+            continue
+        partition = pa.array([report_date] * table.num_rows, type=pa.string())
+        tables.append(table.add_column(0, PARTITION_KEY, partition))
+
+    if not tables:
+        return pa.table({PARTITION_KEY: pa.array([], type=pa.string())})
+    return pa.concat_tables(tables, promote_options='default')
+
+
+def load_panel(statement: str, root: str = DEFAULT_PANEL_ROOT,
+               columns: Optional[Iterable[str]] = None,
+               report_dates: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """加载报表面板为 DataFrame，列结构与 parse_statement_frame 一致(可按 columns 投影)"""
+    return load_panel_table(statement, root, columns, report_dates).to_pandas(split_blocks=True)
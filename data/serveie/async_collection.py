@@ -0,0 +1,87 @@
+import logging
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+
+from data.collectors.statement_engine import statement_engine
+
+logger = logging.getLogger(__name__)
+
+StatementResult = Tuple[str, str, Optional[dict]]
+
+
+async def stream_financial_statements(tickers: Iterable[str], date_std: str,
+                                      statements: Optional[Iterable[str]] = None,
+                                      concurrency: int = 8) -> AsyncIterator[StatementResult]:
+    """并发获取多只股票的多张报表，按完成顺序逐个产出
+
+    采集函数本身是同步的，这里放到线程池中执行，并用信号量限制同时在途的请求数
+
+    参数:
+        tickers: 标准化股票代码列表(如 600519.SH)
+        date_std: 目标日期(YYYY-MM-DD)
+        statements: 需要获取的报表类型，默认为报表引擎中注册的全部报表
+        concurrency: 最大并发请求数
+
+    产出:
+        tuple: (股票代码, 报表类型, 响应数据)，请求失败或出错时响应数据为 None
+    """
+    statements = list(statements) if statements is not None else statement_engine.names()
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def fetch_one(ticker: str, statement: str) -> StatementResult:
+        async with semaphore:
+            try:
+                data = await loop.run_in_executor(executor, statement_engine.fetch, statement, ticker, date_std)
+            except Exception:
+                # 单只股票的意外错误按失败处理，不中断其余任务
+                logger.exception("%s %s 采集出错", ticker, statement)
+                data = None
+        return ticker, statement, data
+
+    tasks = [
+        asyncio.ensure_future(fetch_one(ticker, statement))
+        for ticker in tickers
+        for statement in statements
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False)
+
+
+def parse_statement_result(ticker: str, statement: str, data: dict):
+    """默认的结果处理: 交给报表引擎解析"""
+    statement_engine.parse(statement, data)
+
+
+async def collect_financial_statements(tickers: Iterable[str], date_std: str,
+                                       statements: Optional[Iterable[str]] = None,
+                                       concurrency: int = 8,
+                                       on_result: Callable[[str, str, dict], None] = parse_statement_result) -> Dict[str, int]:
+    """并发采集并在每个结果到达时立即解析
+
+    on_result 在事件循环线程中依次调用，不会与其他回调并发执行
+
+    返回:
+        dict: 成功/失败的请求数
+    """
+    summary = {'成功': 0, '失败': 0}
+    async for ticker, statement, data in stream_financial_statements(tickers, date_std, statements, concurrency):
+        if data is None:
+            summary['失败'] += 1
+            logger.warning("%s %s 获取失败", ticker, statement)
+            continue
+        on_result(ticker, statement, data)
+        summary['成功'] += 1
+    return summary
+
+
+def run_collection(tickers: Iterable[str], date_std: str, concurrency: int = 8, **kwargs) -> Dict[str, int]:
+    """同步入口，供非异步代码调用"""
+    return asyncio.run(collect_financial_statements(tickers, date_std, concurrency=concurrency, **kwargs))
@@ -0,0 +1,113 @@
+import json
+import logging
+import os
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional
+
+from data.collectors.eastmoney_api import build_report_filter, iter_report_pages
+from data.collectors.statement_engine import statement_engine
+from data.database.datebase import get_warehouse
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillCheckpoint:
+    """回补进度检查点(JSON 文件)
+
+    记录每张报表已完成到第几组股票的第几页；参数不一致的旧检查点会被忽略
+    """
+
+    def __init__(self, path: Optional[str], params: dict):
+        self.path = path
+        self.params = params
+        self.progress: Dict[str, Dict[str, int]] = {}
+        if path and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            if saved.get('params') == params:
+                self.progress = saved.get('progress', {})
+            else:
+                logger.warning("检查点 %s 的参数与本次不一致，重新开始回补", path)
+
+    def position(self, statement: str) -> Dict[str, int]:
+        return self.progress.get(statement, {'chunk': 0, 'page': 1})
+
+    def save(self, statement: str, chunk: int, page: int):
+        self.progress[statement] = {'chunk': chunk, 'page': page}
+        if not self.path:
+            return
+        # 先写临时文件再替换，避免中断时留下损坏的检查点
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'params': self.params, 'progress': self.progress}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def finish(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def backfill_history(stock_codes: Iterable[str], start_date: str, end_date: str,
+                     statements: Optional[Iterable[str]] = None,
+                     chunk_size: int = 10,
+                     page_size: int = 200,
+                     checkpoint_path: Optional[str] = None,
+                     on_page: Optional[Callable[[str, dict], None]] = None,
+                     keep_in_memory: bool = False) -> Dict[str, Dict[str, int]]:
+    """回补任意日期区间的完整历史报表
+
+    按 chunk_size 只股票一组、以 p=1..N 逐页请求，每页到达后立即解析并写入本地数据库，
+    并在检查点中记录进度；中断后用同一个 checkpoint_path 重新调用即可从中断的那一页继续。
+    默认不在内存仓库中保留记录，全市场多年回补的内存占用与历史长度无关。
+
+    接口按报告期倒序分页，中断期间新增的报告期只会使续传时重复读取少量数据行，
+    写入为 upsert，不会产生重复记录
+
+    参数:
+        stock_codes: 股票代码列表(如 600519.SH)
+        start_date: 报告期起始日期(YYYY-MM-DD，含)
+        end_date: 报告期结束日期(YYYY-MM-DD，含)
+        statements: 需要回补的报表类型，默认为报表引擎中注册的全部报表
+        chunk_size: 每个请求包含的股票数量(分页顺序由 报告期 + 股票代码 排序保证，见 build_report_url)
+        page_size: 每页行数
+        checkpoint_path: 检查点文件路径，为 None 时不支持续传
+        on_page: 每页数据的处理函数(报表类型, 响应)，默认解析后写入本地数据库
+        keep_in_memory: 默认处理函数是否同时把记录保留在内存仓库中
+
+    返回:
+        dict: {报表类型: {'页数': ..., '数据行数': ...}}
+    """
+    if on_page is None and not keep_in_memory and get_warehouse() is None:
+        raise RuntimeError("回补需要启用本地仓库(或传入 keep_in_memory=True / on_page)")
+
+    codes = list(dict.fromkeys(code.strip().upper() for code in stock_codes))
+    chunks = [codes[i:i + chunk_size] for i in range(0, len(codes), chunk_size)]
+    checkpoint = BackfillCheckpoint(checkpoint_path, {
+        'stock_codes': codes, 'start_date': start_date, 'end_date': end_date,
+        'chunk_size': chunk_size, 'page_size': page_size,
+    })
+
+    summary = {}
+    for statement in (statements if statements is not None else statement_engine.names()):
+        descriptor = statement_engine.descriptor(statement)
+        handle = on_page or partial(statement_engine.parse, keep_in_memory=keep_in_memory)
+        position = checkpoint.position(statement)
+        pages = rows = 0
+
+        for chunk_index in range(position['chunk'], len(chunks)):
+            page = position['page'] if chunk_index == position['chunk'] else 1
+            filter_str = build_report_filter(chunks[chunk_index], start_date=start_date, end_date=end_date)
+            for response_data in iter_report_pages(descriptor.report_type, descriptor.sty, filter_str, page_size,
+                                                   start_page=page):
+                handle(statement, response_data)
+                pages += 1
+                rows += len(response_data['result']['data'])
+                page += 1
+                checkpoint.save(statement, chunk_index, page)
+            checkpoint.save(statement, chunk_index + 1, 1)
+            logger.info("%s: 已完成 %d/%d 组，累计 %d 页 %d 行", statement, chunk_index + 1, len(chunks), pages, rows)
+
+        summary[statement] = {'页数': pages, '数据行数': rows}
+
+    checkpoint.finish()
+    return summary
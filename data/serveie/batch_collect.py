@@ -0,0 +1,284 @@
+"""非交互式批量采集入口，可由 cron 等定时任务直接调用
+
+输入文件每行一只股票，可选附带日期(逗号、空格或制表符分隔)，# 开头为注释:
+    600519
+    000001.SZ,2024-03-31
+
+用法:
+    python -m data.serveie.batch_collect --input tickers.txt --date 2024-05-01 --workers 16
+    cat tickers.txt | python -m data.serveie.batch_collect --input - --date 2024-05-01 --output csv --output-path out/
+    python -m data.serveie.batch_collect --all-market --date 2024-05-01 --output parquet   # 按 50 只一组批量请求
+    python -m data.serveie.batch_collect --input tickers.txt --date 2024-05-01 --batch-size 50
+    python -m data.serveie.batch_collect --input tickers.txt --date 2024-05-01 --cache     # 启用磁盘响应缓存
+    python -m data.serveie.batch_collect --input tickers.txt --date 2024-05-01 --offline   # 只用缓存的响应重新解析
+    python -m data.serveie.batch_collect --input tickers.txt --date 2024-05-01 --metrics metrics.prom
+"""
+import argparse
+import asyncio
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from data.base_api.instrumentation import DEFAULT_LOG_LEVEL, DEFAULT_METRICS_PATH, configure_logging, metrics
+from data.base_api.response_cache import enable_response_cache
+from data.collectors.china_stock_input import ChinaStockValidator
+from data.collectors.statement_engine import statement_engine
+from data.serveie.async_collection import parse_statement_result, stream_financial_statements
+
+OUTPUTS = ('store', 'parquet', 'csv')
+
+_SEPARATOR = re.compile(r'[,\s]+')
+
+# 全市场模式只采集沪深两市；快照中的北交所(4/8/92 开头)等代码由报表校验规则拒绝，不计为失败
+_SH_SZ_CODE = re.compile(r'^[036][0-9]{5}$')
+
+
+def read_requests(stream: TextIO, default_date: Optional[str]) -> List[Tuple[str, Optional[str]]]:
+    """读取 [(原始股票代码, 原始日期), ...]，行内未给出日期时使用 default_date"""
+    rows = []
+    for line in stream:
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        parts = _SEPARATOR.split(line)
+        rows.append((parts[0], parts[1] if len(parts) > 1 else default_date))
+    return rows
+
+
+def whole_market_requests(date_std: str) -> List[Tuple[str, Optional[str]]]:
+    """从 aktools 全市场资产负债表快照中取出最近报告期的全部沪深股票代码"""
+    from data.collectors.report_calendar import find_closest_report_date
+    from data.collectors.stock_balance_sheet import CODE_COLUMN, stream_balance_sheet_date
+
+    # 只需要股票代码列，流式读取时丢弃其余字段
+    report_date = find_closest_report_date(date_std).replace('-', '')
+    codes = [code for chunk in stream_balance_sheet_date(report_date, columns=[]) for code in chunk[CODE_COLUMN]]
+    if not codes:
+        raise RuntimeError(f"无法获取 {date_std} 的全市场股票列表")
+    supported = [code for code in codes if _SH_SZ_CODE.match(str(code))]
+    if len(supported) < len(codes):
+        print(f"全市场快照中 {len(codes) - len(supported)} 只非沪深股票(如北交所)不采集", file=sys.stderr)
+    return [(code, date_std) for code in supported]
+
+
+def validate_requests(rows: Iterable[Tuple[str, Optional[str]]],
+                      validator: Optional[ChinaStockValidator] = None) -> Tuple[Dict[str, List[str]], List[str]]:
+    """整列校验股票代码和日期，按日期分组
+
+    返回:
+        tuple: ({标准日期: [标准股票代码, ...]}, [错误信息, ...])
+    """
+    validator = validator or ChinaStockValidator()
+    rows = list(rows)
+    raw_tickers = [ticker for ticker, _ in rows]
+    raw_dates = [date for _, date in rows]
+    ticker_valid, tickers, ticker_errors = validator.validate_tickers(raw_tickers)
+    date_valid, dates, date_errors = validator.validate_dates(raw_dates)
+
+    grouped: Dict[str, List[str]] = defaultdict(list)
+    errors = []
+    for i in range(len(rows)):
+        if not ticker_valid[i]:
+            errors.append(f"第{i + 1}行 {raw_tickers[i]}: {ticker_errors.iat[i]}")
+        elif raw_dates[i] is None:
+            errors.append(f"第{i + 1}行 {raw_tickers[i]}: 缺少日期")
+        elif not date_valid[i]:
+            errors.append(f"第{i + 1}行 {raw_dates[i]}: {date_errors.iat[i]}")
+        else:
+            grouped[dates.iat[i]].append(tickers.iat[i])
+    return {date: list(dict.fromkeys(codes)) for date, codes in grouped.items()}, errors
+
+
+class Progress:
+    """在 stderr 上刷新进度和吞吐量
+
+    只在终端上显示，且最多每 interval 秒刷新一次；输出被重定向(cron、日志文件)时不刷新，
+    结束时的汇总信息由调用方输出
+    """
+
+    def __init__(self, total: int, stream: TextIO = sys.stderr, interval: float = 0.5):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.enabled = stream.isatty()
+        self.done = self.failed = self.rows = 0
+        self.started = time.perf_counter()
+        self._shown = None
+
+    def update(self, rows: int = 0, failed: bool = False):
+        self.done += 1
+        self.failed += failed
+        self.rows += rows
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._shown is not None and now - self._shown < self.interval and self.done < self.total:
+            return
+        self._shown = now
+        elapsed = max(now - self.started, 1e-9)
+        self.stream.write(
+            f"\r[{self.done}/{self.total}] 失败 {self.failed} | "
+            f"{self.done / elapsed:.1f} 条/秒 | {self.rows / elapsed:.0f} 行/秒"
+        )
+        self.stream.flush()
+
+    def finish(self):
+        if self._shown is not None:
+            self.stream.write("\n")
+            self.stream.flush()
+
+
+async def collect_batches(batches: Dict[str, List[str]], statements: Iterable[str],
+                          workers: int, progress: Progress) -> Dict[str, int]:
+    """按日期依次采集，每个日期内部以 workers 个并发请求执行"""
+    summary = {'成功': 0, '失败': 0}
+    for date_std, tickers in batches.items():
+        async for ticker, statement, data in stream_financial_statements(tickers, date_std, statements, workers):
+            if data is None:
+                summary['失败'] += 1
+                progress.update(failed=True)
+                continue
+            parse_statement_result(ticker, statement, data)
+            summary['成功'] += 1
+            progress.update(rows=len(data.get('result', {}).get('data') or []))
+    return summary
+
+
+def collect_batched(batches: Dict[str, List[str]], statements: Iterable[str], batch_size: int,
+                    workers: int, progress: Progress) -> Dict[str, int]:
+    """按日期依次采集，每个日期用 SECUCODE in (...) 批量请求，每个请求包含 batch_size 只股票
+
+    请求的报告期与逐只请求相同(目标日期最近报告期及之前 4 个报告期)
+    """
+    from data.collectors.report_calendar import find_closest_report_date, get_previous_report_dates
+
+    summary = {'成功': 0, '失败': 0}
+
+    def on_chunk(statement: str, responses: Dict[str, dict]):
+        for response_data in responses.values():
+            if not response_data.get('success'):
+                summary['失败'] += 1
+                progress.update(failed=True)
+                continue
+            summary['成功'] += 1
+            progress.update(rows=len(response_data['result']['data']))
+
+    for date_std, tickers in batches.items():
+        report_dates = get_previous_report_dates(find_closest_report_date(date_std), 4)
+        statement_engine.collect_batch(tickers, report_dates=report_dates, statements=statements,
+                                       chunk_size=batch_size, workers=workers, on_chunk=on_chunk)
+    return summary
+
+
+def write_output(output: str, output_path: Optional[str]) -> Optional[str]:
+    """把内存仓库中的采集结果写到指定输出，返回输出位置
+
+    store 模式下解析函数已经写入本地仓库，这里无需额外处理
+    """
+    if output == 'store':
+        from data.database.datebase import get_warehouse
+        warehouse = get_warehouse()
+        return warehouse.database_name if warehouse is not None else None
+
+    if output == 'parquet':
+        from data.database.panel_export import DEFAULT_PANEL_ROOT, export_stores
+        root = output_path or DEFAULT_PANEL_ROOT
+        export_stores(root, 'parquet')
+        return root
+
+    from data.collectors.statement_record import records_to_frame
+
+    root = output_path or '.'
+    os.makedirs(root, exist_ok=True)
+    for statement, descriptor in statement_engine.statements.items():
+        records_to_frame(descriptor.store.items(), descriptor.schema).to_csv(
+            os.path.join(root, f"{statement}.csv"), index=False, encoding='utf-8-sig'
+        )
+    return root
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="批量采集沪深股票财务报表")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--input', help="股票列表文件，- 表示从标准输入读取")
+    source.add_argument('--all-market', action='store_true', help="采集全市场股票(需要 aktools 服务)")
+    parser.add_argument('--date', help="默认日期(YYYY-MM-DD)，用于未指定日期的行以及全市场模式")
+    parser.add_argument('--statements', default=','.join(statement_engine.names()),
+                        help="报表类型，逗号分隔(默认: %(default)s)")
+    parser.add_argument('--workers', type=int, default=8, help="并发请求数(默认: %(default)s)")
+    parser.add_argument('--batch-size', type=int,
+                        help="每个批量请求包含的股票数，0 表示逐只请求(默认: 全市场模式 50，其余 0)")
+    parser.add_argument('--output', choices=OUTPUTS, default='store', help="输出方式(默认: %(default)s)")
+    parser.add_argument('--output-path', help="parquet/csv 输出目录")
+    parser.add_argument('--cache', action='store_true',
+                        help="启用磁盘响应缓存: 重跑时复用已下载的响应，但有效期内(报表 7 天)看不到新披露或更正的数据")
+    parser.add_argument('--offline', action='store_true', help="只使用磁盘响应缓存，不发网络请求(隐含 --cache)")
+    parser.add_argument('--metrics', default=DEFAULT_METRICS_PATH,
+                        help="结束时把采集指标写到该文件(.json 为 JSON 快照，其余为 Prometheus 文本)")
+    parser.add_argument('--log-level', default=DEFAULT_LOG_LEVEL, help="日志级别(默认: %(default)s)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """返回进程退出码: 0 全部成功，1 存在校验或采集失败，2 参数错误"""
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level)
+    statements = [statement.strip() for statement in args.statements.split(',') if statement.strip()]
+    unknown = [statement for statement in statements if statement not in statement_engine.statements]
+    if unknown:
+        print(f"未知的报表类型: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    if args.cache or args.offline:
+        cache = enable_response_cache()
+        if args.offline:
+            cache.offline = True
+
+    validator = ChinaStockValidator()
+    if args.all_market:
+        if not args.date:
+            print("全市场模式需要指定 --date", file=sys.stderr)
+            return 2
+        date_valid, date_std, date_error = validator.validate_date(args.date)
+        if not date_valid:
+            print(f"日期错误: {date_error}", file=sys.stderr)
+            return 2
+        rows = whole_market_requests(date_std)
+    elif args.input == '-':
+        rows = read_requests(sys.stdin, args.date)
+    else:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            rows = read_requests(f, args.date)
+
+    batches, errors = validate_requests(rows, validator)
+    for error in errors:
+        print(f"跳过 {error}", file=sys.stderr)
+
+    batch_size = args.batch_size if args.batch_size is not None else (50 if args.all_market else 0)
+    stocks = sum(len(tickers) for tickers in batches.values())
+    total = stocks * len(statements)
+    mode = f"每个请求 {batch_size} 只股票" if batch_size > 0 else "逐只请求"
+    print(f"共 {stocks} 只股票、{len(batches)} 个日期、{total} 条报表，{mode}，{args.workers} 个并发",
+          file=sys.stderr)
+
+    progress = Progress(total)
+    if batch_size > 0:
+        summary = collect_batched(batches, statements, batch_size, args.workers, progress)
+    else:
+        summary = asyncio.run(collect_batches(batches, statements, args.workers, progress))
+    progress.finish()
+
+    location = write_output(args.output, args.output_path)
+    elapsed = time.perf_counter() - progress.started
+    print(f"完成: 成功 {summary['成功']}，失败 {summary['失败']}，{progress.rows} 行，耗时 {elapsed:.1f} 秒"
+          + (f"，输出到 {location}" if location else ""), file=sys.stderr)
+    if args.metrics:
+        metrics.export(args.metrics)
+    return 1 if summary['失败'] or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
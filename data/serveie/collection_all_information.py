@@ -1,27 +1,31 @@
+import logging
 import sys
+from data.base_api.instrumentation import DEFAULT_METRICS_PATH, configure_logging, metrics
 from data.collectors.china_stock_input import china_stock_import
-from data.collectors.get_balance_sheet import parse_financial_balance_data, print_financial_data, get_financial_balance_data
+from data.collectors.statement_engine import statement_engine
 from datetime import datetime
-from data.collectors.get_profit_sheet import get_financial_Profit_data, parse_financial_profit_data
+from data.serveie.async_collection import run_collection
 
-# 全局变量，用于存储按期间分类的财务数据
-financial_balance_sheet_data_by_period = {}
-financial_profit_sheet_data_by_period = {}
+logger = logging.getLogger(__name__)
 
 def main():
+    configure_logging()
+
     # 1. 获取用户输入的股票代码和日期
     ticker, date_std = china_stock_import()
 
-    # 2. 获取该股票在指定日期的财务数据
-    financial_BS_data = get_financial_balance_data(ticker, date_std)
-    financial_PS_data = get_financial_Profit_data(ticker, date_std)
+    # 2. 并发获取全部报表(资产负债表、利润表、现金流量表)，到达后立即解析并存储到全局仓库中
+    run_collection([ticker], date_std)
 
-    # 3. 解析财务数据并存储到全局变量中
-    parse_financial_balance_data(financial_BS_data)
-    parse_financial_profit_data(financial_PS_data)
+    # 3. 打印财务数据
+    for statement in statement_engine.names():
+        statement_engine.print_statement(statement, ticker)
 
-    # 4. 打印财务数据
-    print_financial_data()
+    # 4. 各阶段耗时统计
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("采集指标:\n%s", metrics.summary())
+    if DEFAULT_METRICS_PATH:
+        metrics.export(DEFAULT_METRICS_PATH)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
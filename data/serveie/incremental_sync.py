@@ -0,0 +1,126 @@
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, Optional
+
+from data.collectors.report_calendar import find_closest_report_date, get_previous_report_dates
+from data.collectors.statement_engine import statement_engine
+from data.database.datebase import get_warehouse
+
+logger = logging.getLogger(__name__)
+
+
+def plan_sync(held: Dict[str, Dict[str, str]], wanted_dates: Iterable[str],
+              restate_periods: int = 1) -> Dict[frozenset, list]:
+    """根据已入库的报告期生成请求计划
+
+    需要请求的报告期 = 缺失的报告期 + 最近 restate_periods 个报告期(可能被更正)；
+    需要请求相同报告期集合的股票合并为一组，便于批量请求
+
+    返回:
+        dict: {报告期集合: [股票代码, ...]}
+    """
+    wanted_dates = sorted(wanted_dates)
+    recent = set(wanted_dates[-restate_periods:]) if restate_periods > 0 else set()
+
+    plan: Dict[frozenset, list] = defaultdict(list)
+    for code, periods in held.items():
+        missing = {date for date in wanted_dates if date not in periods}
+        needed = frozenset(missing | recent)
+        if needed:
+            plan[needed].append(code)
+    return plan
+
+
+def full_fetch_requests(stock_count: int, period_count: int, chunk_size: int = 50, page_size: int = 200) -> int:
+    """不做增量、把同一窗口全部重新获取时需要的请求数
+
+    按 chunk_size 只股票一组批量请求，每组按每只股票每个报告期一行估算分页数(上限)
+    """
+    requests = 0
+    for start in range(0, stock_count, chunk_size):
+        rows = min(chunk_size, stock_count - start) * period_count
+        requests += max(1, math.ceil(rows / page_size))
+    return requests
+
+
+def incremental_sync(stock_codes: Iterable[str], target_date_str: str,
+                     statements: Optional[Iterable[str]] = None,
+                     history: int = 4,
+                     restate_periods: int = 1,
+                     chunk_size: int = 50,
+                     page_size: int = 200) -> Dict[str, Dict[str, int]]:
+    """增量同步: 只请求仓库中缺失的报告期以及最近可能被更正的报告期
+
+    参数:
+        stock_codes: 股票代码列表(如 600519.SH)
+        target_date_str: 目标日期(YYYY-MM-DD)
+        statements: 需要同步的报表类型，默认为报表引擎中注册的全部报表
+        history: 目标报告期之前再取多少个报告期(与单只股票接口一致，默认4个)
+        restate_periods: 即使已入库也重新检查的最近报告期数量
+        chunk_size: 每个批量请求包含的股票数量
+        page_size: 每页行数
+
+    返回:
+        dict: {报表类型: 同步统计}；“跳过的报告期数”为已入库而不必重新请求的 (股票, 报告期) 数，
+              “节省请求数”相对于以同样的分组和分页把整个窗口全部重新获取计算(可能为负，
+              如需要请求的报告期组合很零散时)
+    """
+    warehouse = get_warehouse()
+    if warehouse is None:
+        raise RuntimeError("增量同步需要启用本地仓库")
+
+    codes = list(dict.fromkeys(code.strip().upper() for code in stock_codes))
+    wanted_dates = get_previous_report_dates(find_closest_report_date(target_date_str), history)
+
+    report = {}
+    for statement in (statements if statements is not None else statement_engine.names()):
+        statement_engine.descriptor(statement)
+        held = warehouse.held_periods(statement, codes)
+        plan = plan_sync(held, wanted_dates, restate_periods)
+
+        stats = {'requests': 0}
+        fetched_rows = 0
+        restated = 0
+        failed = 0
+        for periods, group in plan.items():
+            # 缺失和可能被更正的报告期都要取接口的最新数据，不能用磁盘响应缓存中的旧响应
+            responses = statement_engine.fetch_batch(statement, group, report_dates=sorted(periods),
+                                                     chunk_size=chunk_size, page_size=page_size, stats=stats,
+                                                     refresh=True)
+            for code, response_data in responses.items():
+                if not response_data.get('success'):
+                    # 请求失败的股票不计入已同步，下次同步时仍会请求
+                    failed += 1
+                    continue
+                rows = response_data['result']['data']
+                for item in rows:
+                    report_date = (item.get('REPORT_DATE') or '').split(' ')[0]
+                    notice_date = (item.get('NOTICE_DATE') or '').split(' ')[0]
+                    old_notice = held.get(code, {}).get(report_date)
+                    if old_notice is not None and old_notice != notice_date:
+                        restated += 1
+                fetched_rows += len(rows)
+                if rows:
+                    statement_engine.parse(statement, response_data)
+
+        wanted_pairs = len(codes) * len(wanted_dates)
+        skipped_pairs = wanted_pairs - sum(len(periods) * len(group) for periods, group in plan.items())
+        full_requests = full_fetch_requests(len(codes), len(wanted_dates), chunk_size, page_size)
+        report[statement] = {
+            '股票数': len(codes),
+            '目标报告期数': wanted_pairs,
+            '跳过的报告期数': skipped_pairs,
+            '获取的数据行数': fetched_rows,
+            '更正的报告期数': restated,
+            '请求失败的股票数': failed,
+            '实际请求数': stats['requests'],
+            '全量请求数': full_requests,
+            '节省请求数': full_requests - stats['requests'],
+        }
+        logger.info("%s: 跳过 %d/%d 个报告期，请求 %d 次(全量重新获取需 %d 次)，更正 %d 个", statement,
+                    skipped_pairs, wanted_pairs, stats['requests'], full_requests, restated)
+        if failed:
+            logger.warning("%s: %d 只股票请求失败，下次同步时重试", statement, failed)
+
+    return report